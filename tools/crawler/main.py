@@ -26,13 +26,19 @@ import json
 import logging
 import os
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import TypedDict
 
 from dotenv import load_dotenv
 
-from src.drive_client import DriveClient
-from src.mcp_client import MCPClient
+try:
+    import uvloop
+except ImportError:  # uvloop is optional and unavailable on Windows
+    uvloop = None
+
+from src.drive_client import DriveClient, MCPServerConfig, dedupe_file_configs
+from src.mcp_client import AdmissionController, MCPClient, ServerResult
 from src.yaml_generator import YAMLGenerator
 
 
@@ -80,9 +86,34 @@ def parse_drive_file_ids(env_value: str) -> list[FileConfig]:
             pass
 
     # Fallback: comma-separated IDs
-    ids = [id.strip() for id in env_value.split(",") if id.strip()]
+    ids = [stripped for id in env_value.split(",") if (stripped := id.strip())]
     return [{"name": f"Source_{i + 1}", "id": id} for i, id in enumerate(ids)]
 
+
+def dedupe_server_candidates(candidates: list[MCPServerConfig]) -> list[MCPServerConfig]:
+    """
+    Remove candidate configs that would make the same connection attempt.
+
+    Candidates with the same URL and headers are collapsed into the one with
+    the highest priority, so fallback never retries an identical request.
+
+    Args:
+        candidates: Configs for one server in priority order (last = highest)
+
+    Returns:
+        Distinct configs, in priority order
+    """
+    seen: set[tuple] = set()
+    unique: list[MCPServerConfig] = []
+    for config in reversed(candidates):
+        key = (config.url, tuple(sorted((config.headers or {}).items())))
+        if key not in seen:
+            seen.add(key)
+            unique.append(config)
+    unique.reverse()
+    return unique
+
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -110,8 +141,15 @@ def parse_args() -> argparse.Namespace:
         "--max-concurrent",
         "-c",
         type=int,
-        default=10,
-        help="Maximum concurrent connections (default: 10)",
+        default=50,
+        help="Maximum concurrent connections (default: 50)",
+    )
+
+    parser.add_argument(
+        "--max-concurrent-per-host",
+        type=int,
+        default=8,
+        help="Maximum concurrent connections to a single MCP host (default: 8)",
     )
 
     parser.add_argument(
@@ -123,11 +161,18 @@ def parse_args() -> argparse.Namespace:
     )
 
     parser.add_argument(
-        "--delay",
-        "-d",
+        "--connect-timeout",
         type=float,
-        default=0.5,
-        help="Delay between requests in seconds (default: 0.5)",
+        default=10.0,
+        help="Timeout for opening a connection to a server in seconds (default: 10.0)",
+    )
+
+    parser.add_argument(
+        "--rate-limit",
+        "-r",
+        type=float,
+        default=20.0,
+        help="Maximum server connections per second to a single host, 0 to disable (default: 20)",
     )
 
     parser.add_argument(
@@ -137,6 +182,12 @@ def parse_args() -> argparse.Namespace:
         help="Merge with existing catalog instead of replacing",
     )
 
+    parser.add_argument(
+        "--fast-yaml",
+        action="store_true",
+        help="Write the catalog with the fast built-in YAML writer (all strings quoted)",
+    )
+
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -150,6 +201,14 @@ def parse_args() -> argparse.Namespace:
         help="Enable verbose logging",
     )
 
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Cache Drive downloads in this directory (default: no cache). "
+        "Cached configs may contain API keys, so keep it out of shared artifacts",
+    )
+
     parser.add_argument(
         "--limit",
         "-l",
@@ -203,45 +262,47 @@ async def main() -> int:
         script_dir = Path(__file__).parent
         output_path = script_dir.parent.parent / "mcp_tool_catalog.yaml"
 
+    # Drive download cache is opt-in: cached configs can contain secrets
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
+
     logger.info("=" * 60)
     logger.info("MCP Tool Catalog Crawler")
     logger.info("=" * 60)
 
     # Step 1: Fetch MCP config from Google Drive
-    drive_client = DriveClient()
-    server_candidates: dict[str, list] = {}
-
-    # Step 1a: Fetch from explicit file IDs (if any)
-    if file_configs:
-        logger.info(f"Step 1a: Fetching MCP configuration from {len(file_configs)} explicit file(s)...")
-        try:
-            file_candidates = await drive_client.fetch_mcp_configs_multi(file_configs)
-            # Merge into server_candidates
-            for server_id, configs in file_candidates.items():
-                if server_id not in server_candidates:
-                    server_candidates[server_id] = []
-                server_candidates[server_id].extend(configs)
-        except Exception as e:
-            logger.error(f"Failed to fetch MCP config from explicit files: {e}")
-            return 1
-
-    # Step 1b: Fetch from folder scan (if enabled) - Loop over folders
-    if folder_ids:
+    # A single DriveClient session is shared by every Drive request in this step
+    async with DriveClient(
+        max_concurrent=args.max_concurrent, cache_dir=cache_dir
+    ) as drive_client:
+        # Step 1a: Explicit file IDs (if any)
+        sources: list[FileConfig] = list(file_configs)
+        if file_configs:
+            logger.info(f"Step 1a: Using {len(file_configs)} explicit file(s)")
+
+        # Step 1b: List files from folder scan (if enabled) - Loop over folders
+        # Folder files are appended after explicit files, so they take priority
         for f_id in folder_ids:
             logger.info(f"Step 1b: Scanning folder recursively: {f_id}")
             try:
-                folder_candidates = await drive_client.fetch_mcp_configs_from_folder(
-                    f_id, google_api_key
+                sources.extend(
+                    await drive_client.list_folder_mcp_files(f_id, google_api_key)
                 )
-                # Merge into server_candidates (folder configs appended, so they take priority)
-                for server_id, configs in folder_candidates.items():
-                    if server_id not in server_candidates:
-                        server_candidates[server_id] = []
-                    server_candidates[server_id].extend(configs)
             except Exception as e:
                 logger.error(f"Failed to scan folder {f_id}: {e}")
                 return 1
 
+        # Step 1c: Download every distinct file once
+        unique_sources = dedupe_file_configs(sources)
+        if len(unique_sources) < len(sources):
+            logger.info(f"Skipped {len(sources) - len(unique_sources)} duplicate file(s)")
+
+        logger.info(f"Step 1c: Fetching MCP configuration from {len(unique_sources)} file(s)...")
+        try:
+            server_candidates = await drive_client.fetch_mcp_configs_multi(unique_sources)
+        except Exception as e:
+            logger.error(f"Failed to fetch MCP config from Drive: {e}")
+            return 1
+
     if not server_candidates:
         logger.warning("No MCP servers found in configuration")
         return 0
@@ -252,23 +313,55 @@ async def main() -> int:
         server_ids = server_ids[:args.limit]
         logger.info(f"Limited to first {len(server_ids)} server(s) for testing")
 
+    for server_id in server_ids:
+        candidates = server_candidates[server_id]
+        unique_candidates = dedupe_server_candidates(candidates)
+        if len(unique_candidates) < len(candidates):
+            logger.debug(
+                f"[{server_id}] Collapsed {len(candidates) - len(unique_candidates)} "
+                "duplicate config(s)"
+            )
+            server_candidates[server_id] = unique_candidates
+
     # Step 2: Crawl MCP servers with fallback support
     logger.info(f"Step 2: Crawling {len(server_ids)} MCP servers...")
     logger.info(f"  Max concurrent: {args.max_concurrent}")
-    logger.info(f"  Timeout: {args.timeout}s")
-    logger.info(f"  Delay: {args.delay}s")
+    logger.info(f"  Max concurrent per host: {args.max_concurrent_per_host}")
+    logger.info(f"  Timeout: {args.timeout}s (connect {args.connect_timeout}s)")
+    logger.info(f"  Rate limit: {args.rate_limit}/s per host")
 
-    mcp_client = MCPClient(timeout=args.timeout, delay=args.delay)
-    semaphore = asyncio.Semaphore(args.max_concurrent)
+    yaml_generator = YAMLGenerator(fast_yaml=args.fast_yaml)
+
+    # Parse the existing catalog in a worker thread while servers are crawled
+    existing_catalog_task = None
+    if args.merge:
+        existing_catalog_task = asyncio.create_task(
+            asyncio.to_thread(yaml_generator.load_existing_catalog, output_path)
+        )
+
+    mcp_client = MCPClient(
+        timeout=args.timeout,
+        connect_timeout=args.connect_timeout,
+        connection_limit=args.max_concurrent,
+        connection_limit_per_host=args.max_concurrent_per_host,
+        rate_limit=args.rate_limit or None,
+    )
+    admission = AdmissionController(args.max_concurrent)
 
     async def process_server_with_limit(
         server_id: str, candidates: list
-    ) -> "ServerResult":
-        async with semaphore:
-            result = await mcp_client.fetch_tools_with_fallback(server_id, candidates)
-            if mcp_client.delay > 0:
-                await asyncio.sleep(mcp_client.delay)
-            return result
+    ) -> ServerResult:
+        try:
+            async with admission:
+                return await mcp_client.fetch_tools_with_fallback(server_id, candidates)
+        except Exception as e:
+            return ServerResult(
+                id=server_id,
+                url="(multiple sources)",
+                status="error",
+                last_checked=datetime.now(timezone.utc).isoformat(),
+                error_message=str(e),
+            )
 
     # Create tasks for parallel execution
     tasks = [
@@ -276,47 +369,48 @@ async def main() -> int:
         for server_id in server_ids
     ]
 
-    # Execute with fallback
-    from datetime import datetime, timezone
-    from src.mcp_client import ServerResult
+    # Execute with fallback, tallying results as each server finishes.
+    # The catalog is sorted by server ID, so completion order does not matter.
+    results: list[ServerResult] = []
+    online = offline = errors = skipped = total_tools = 0
+    progress_interval = max(1, len(tasks) // 10)
 
-    raw_results = await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            results.append(result)
 
-    # Process results and handle exceptions
-    results: list[ServerResult] = []
-    for i, result in enumerate(raw_results):
-        if isinstance(result, Exception):
-            server_id = server_ids[i]
-            results.append(
-                ServerResult(
-                    id=server_id,
-                    url="(multiple sources)",
-                    status="error",
-                    last_checked=datetime.now(timezone.utc).isoformat(),
-                    error_message=str(result),
+            if result.status == "online":
+                online += 1
+            elif result.status == "offline":
+                offline += 1
+            elif result.status == "error":
+                errors += 1
+            elif result.status == "skipped":
+                skipped += 1
+            total_tools += len(result.tools)
+
+            if len(results) % progress_interval == 0 and len(results) < len(tasks):
+                logger.info(
+                    f"  Progress: {len(results)}/{len(tasks)} "
+                    f"(online {online}, offline {offline}, errors {errors})"
                 )
-            )
-        else:
-            results.append(result)
+    finally:
+        await mcp_client.aclose()
 
     # Log summary
-    online = sum(1 for r in results if r.status == "online")
-    offline = sum(1 for r in results if r.status == "offline")
-    errors = sum(1 for r in results if r.status == "error")
-    total_tools = sum(len(r.tools) for r in results)
-
     logger.info("Crawling complete:")
     logger.info(f"  Online:  {online}")
     logger.info(f"  Offline: {offline}")
     logger.info(f"  Errors:  {errors}")
+    logger.info(f"  Skipped: {skipped}")
     logger.info(f"  Total tools discovered: {total_tools}")
 
     # Step 3: Generate YAML catalog
     logger.info("Step 3: Generating YAML catalog...")
-    yaml_generator = YAMLGenerator()
 
-    if args.merge:
-        existing_catalog = yaml_generator.load_existing_catalog(output_path)
+    if existing_catalog_task is not None:
+        existing_catalog = await existing_catalog_task
         catalog = yaml_generator.merge_catalogs(results, existing_catalog)
     else:
         catalog = yaml_generator.generate_catalog(results)
@@ -326,7 +420,7 @@ async def main() -> int:
         logger.info("Dry run - printing catalog to stdout:")
         print(yaml_generator.to_yaml_string(catalog))
     else:
-        yaml_generator.save_catalog(catalog, output_path)
+        await asyncio.to_thread(yaml_generator.save_catalog, catalog, output_path)
         logger.info(f"Catalog saved to: {output_path}")
 
     logger.info("=" * 60)
@@ -337,4 +431,6 @@ async def main() -> int:
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        sys.exit(uvloop.run(main()))
     sys.exit(asyncio.run(main()))
@@ -1,17 +1,42 @@
 """Google Drive client for fetching MCP configuration."""
 
-import json
+import asyncio
 import logging
 import os
+import random
 import re
-from dataclasses import dataclass, field
-from datetime import datetime
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
 import aiohttp
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Match ${VAR_NAME} pattern
+ENV_PLACEHOLDER_PATTERN = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+
+# Canonical spelling of the pass key header; normalize_headers stores it under this key
+KAMUI_PASS_HEADER = "KAMUI-CODE-PASS"
+
+
+def _is_kamui_pass_header(key: str) -> bool:
+    """Case-insensitive check for KAMUI-CODE-PASS that only upper()s same-length keys."""
+    return len(key) == len(KAMUI_PASS_HEADER) and key.upper() == KAMUI_PASS_HEADER
+
+
+def _replace_env_match(match: re.Match) -> str:
+    """Return the environment value for a ${VAR} match, or the placeholder if unset."""
+    env_value = os.environ.get(match.group(1))
+    if env_value is not None:
+        return env_value
+    # If not set, return original placeholder
+    return match.group(0)
+
 
 def expand_env_placeholders(value: str) -> str:
     """
@@ -29,83 +54,167 @@ def expand_env_placeholders(value: str) -> str:
     if not value or not isinstance(value, str):
         return value
 
-    def replace_match(match: re.Match) -> str:
-        var_name = match.group(1)
-        env_value = os.environ.get(var_name)
-        if env_value is not None:
-            return env_value
-        # If not set, return original placeholder
-        return match.group(0)
+    # Most header values have no placeholder; skip the regex engine for them
+    if "${" not in value:
+        return value
 
-    # Match ${VAR_NAME} pattern
-    pattern = r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}'
-    return re.sub(pattern, replace_match, value)
+    return ENV_PLACEHOLDER_PATTERN.sub(_replace_env_match, value)
 
 
-def expand_headers(headers: dict[str, str] | None) -> dict[str, str] | None:
+def normalize_headers(
+    headers: dict[str, str] | None, pass_key: str | None = None
+) -> dict[str, str] | None:
     """
-    Expand environment variable placeholders in header values.
+    Prepare server headers for use in a single pass.
 
     Processing:
     1. Expand ${VAR} placeholders with environment variable values
     2. Override KAMUI-CODE-PASS header with KAMUI_CODE_PASS_KEY env var
        (even if the value is not a placeholder)
+    3. Add KAMUI-CODE-PASS header if not present and the env var is set
+
+    The pass key header is always stored under the canonical
+    KAMUI_PASS_HEADER name, so later lookups are a plain dict hit.
 
     Args:
-        headers: Dictionary of header key-value pairs
+        headers: Dictionary of header key-value pairs (may be None)
+        pass_key: KAMUI_CODE_PASS_KEY value, if the caller already read it
+                  ("" means it is not set)
 
     Returns:
-        Dictionary with expanded values, or None if input is None
+        Dictionary with expanded values and KAMUI-CODE-PASS ensured,
+        or None if there are no headers
     """
+    if pass_key is None:
+        pass_key = os.environ.get("KAMUI_CODE_PASS_KEY")
+
     if headers is None:
-        return None
+        return {KAMUI_PASS_HEADER: pass_key} if pass_key else None
 
-    expanded = {}
+    normalized = {}
     for key, value in headers.items():
-        # First expand placeholders
-        expanded_value = expand_env_placeholders(value)
+        if _is_kamui_pass_header(key):
+            # Override KAMUI-CODE-PASS with env var value
+            normalized[KAMUI_PASS_HEADER] = pass_key or expand_env_placeholders(value)
+        else:
+            normalized[key] = expand_env_placeholders(value)
 
-        # Override KAMUI-CODE-PASS with env var value
-        if key.upper() == "KAMUI-CODE-PASS":
-            env_passkey = os.environ.get("KAMUI_CODE_PASS_KEY")
-            if env_passkey:
-                expanded_value = env_passkey
+    if pass_key and KAMUI_PASS_HEADER not in normalized:
+        normalized[KAMUI_PASS_HEADER] = pass_key
 
-        expanded[key] = expanded_value
-    return expanded
+    return normalized or None
 
 
-def ensure_kamui_pass_header(headers: dict[str, str] | None) -> dict[str, str]:
+def dedupe_file_configs(file_configs: list[dict[str, str]]) -> list[dict[str, str]]:
     """
-    Ensure KAMUI-CODE-PASS header exists if KAMUI_CODE_PASS_KEY env var is set.
+    Remove repeated file IDs so each Drive file is downloaded once.
 
-    Processing:
-    1. Create headers dict if None
-    2. Add KAMUI-CODE-PASS header if not present and env var is set
+    A file listed several times (e.g. explicitly and via a folder scan) keeps
+    its last position, which is the one with the highest priority, but the
+    first name it was listed under.
 
     Args:
-        headers: Dictionary of header key-value pairs (may be None)
+        file_configs: {"name": "...", "id": "..."} dicts in priority order
+                      (last = highest)
 
     Returns:
-        Dictionary with KAMUI-CODE-PASS header ensured
+        File configs with unique IDs, in priority order
     """
-    if headers is None:
-        headers = {}
+    names: dict[str, str] = {}
+    for config in file_configs:
+        names.setdefault(config["id"], config["name"])
 
-    env_passkey = os.environ.get("KAMUI_CODE_PASS_KEY")
-    if env_passkey:
-        # Check if KAMUI-CODE-PASS already exists (case-insensitive)
-        has_kamui_pass = any(k.upper() == "KAMUI-CODE-PASS" for k in headers.keys())
-        if not has_kamui_pass:
-            headers["KAMUI-CODE-PASS"] = env_passkey
+    seen: set[str] = set()
+    unique: list[dict[str, str]] = []
+    for config in reversed(file_configs):
+        if config["id"] not in seen:
+            seen.add(config["id"])
+            unique.append({"name": names[config["id"]], "id": config["id"]})
+    unique.reverse()
+    return unique
 
-    return headers
 
 # Default minimum modified time for folder scan filtering (2025-11-20)
 DEFAULT_MIN_MODIFIED_TIME = "2025-11-20T00:00:00"
 
+# Drive folders are listed in batches whose "in parents" clauses stay under this length
+MAX_PARENTS_QUERY_LENGTH = 2000
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+# MIME types Drive reports for uploaded .json files
+JSON_MIME_TYPES = frozenset({"application/json", "text/plain"})
+
+
+def _is_json_candidate(item: dict[str, Any]) -> bool:
+    """
+    Check whether a Drive listing entry can be an MCP config JSON file.
+
+    Native Google files (Docs, Sheets, ...) cannot be downloaded as JSON,
+    and names such as "config.json.bak" only match the ".json" query loosely.
+    """
+    mime_type = item.get("mimeType", "")
+    if mime_type.startswith("application/vnd.google-apps."):
+        return False
+    return mime_type in JSON_MIME_TYPES or item["name"].lower().endswith(".json")
+
+
+# Cached Drive downloads younger than this (seconds) are used without revalidation
+DEFAULT_CACHE_TTL = 3600.0
+
+# Drive downloads are streamed in chunks of this size and capped at MAX_DOWNLOAD_BYTES
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MAX_DOWNLOAD_BYTES = 32 * 1024 * 1024
+
+# Transient Drive responses that are retried with exponential backoff
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 5
+MAX_RETRY_DELAY = 16.0
+MAX_RETRY_AFTER = 60.0
+
+# Files downloaded by a DriveClient are reused from memory for this long (seconds)
+FILE_MEMO_TTL = 300.0
+
+# Default timeouts (seconds) for Drive requests on the shared session.
+# Per-socket limits rather than a total, so large files are not cut off.
+REQUEST_CONNECT_TIMEOUT = 10.0
+REQUEST_READ_TIMEOUT = 30.0
 
-@dataclass
+# JSON bodies at least this large are parsed in a worker thread
+THREADED_PARSE_MIN_BYTES = 64 * 1024
+
+
+async def _parse_json(raw: bytes) -> Any:
+    """
+    Parse a JSON body, moving large ones off the event loop.
+
+    Small configs are parsed inline since a thread hop would cost more than
+    the parse itself.
+    """
+    if len(raw) < THREADED_PARSE_MIN_BYTES:
+        return orjson.loads(raw)
+    return await asyncio.to_thread(orjson.loads, raw)
+
+
+# Lower-cased starts of an HTML page, checked with a single startswith call
+HTML_PREFIXES = (b"<!doctype", b"<html")
+
+
+def _check_not_html(head: bytes) -> None:
+    """
+    Raise if a response body starts like an HTML page.
+
+    Drive serves an HTML page instead of the file when it is not public.
+    Only the first bytes are inspected, case-insensitively.
+    """
+    if head[:64].lstrip().lower().startswith(HTML_PREFIXES):
+        raise Exception(
+            "Received HTML instead of JSON. "
+            "Make sure the file is shared as 'Anyone with the link can view'."
+        )
+
+
+@dataclass(slots=True, frozen=True)
 class MCPServerConfig:
     """MCP server configuration from Drive JSON."""
 
@@ -118,15 +227,17 @@ class MCPServerConfig:
     @classmethod
     def from_dict(cls, data: dict[str, Any], source_name: str = "") -> "MCPServerConfig":
         """Create MCPServerConfig from dictionary."""
-        # Expand environment variable placeholders in headers
         raw_headers = data.get("headers")
-        expanded_headers = expand_headers(raw_headers)
-        # Ensure KAMUI-CODE-PASS header exists if env var is set
-        final_headers = ensure_kamui_pass_header(expanded_headers)
+        pass_key = os.environ.get("KAMUI_CODE_PASS_KEY", "")
+        # Expand placeholders and ensure KAMUI-CODE-PASS if env var is set
         return cls(
             id=data.get("id", ""),
             url=data.get("url", ""),
-            headers=final_headers if final_headers else None,
+            headers=(
+                normalize_headers(raw_headers, pass_key)
+                if raw_headers is not None or pass_key
+                else None
+            ),
             transport=data.get("transport", "sse"),
             source_name=source_name,
         )
@@ -138,9 +249,110 @@ class DriveClient:
     # Direct download URL for public files (no API key required)
     DRIVE_DOWNLOAD_URL = "https://drive.google.com/uc"
 
-    def __init__(self):
-        """Initialize DriveClient."""
-        pass
+    # Drive API v3 files.list endpoint (API key required)
+    DRIVE_FILES_API_URL = "https://www.googleapis.com/drive/v3/files"
+
+    def __init__(
+        self,
+        max_concurrent: int = 10,
+        cache_dir: str | Path | None = None,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+    ):
+        """
+        Initialize DriveClient.
+
+        Args:
+            max_concurrent: Connection pool size for the shared HTTP session.
+            cache_dir: Directory for the on-disk download cache (None disables it).
+            cache_ttl: Age in seconds below which cached files skip revalidation.
+        """
+        self.max_concurrent = max_concurrent
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.cache_ttl = cache_ttl
+        self._session: aiohttp.ClientSession | None = None
+        # File ID -> (monotonic time, raw body) of files fetched by this client
+        self._memo: dict[str, tuple[float, bytes]] = {}
+
+    async def __aenter__(self) -> "DriveClient":
+        """Open the shared HTTP session."""
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Close the shared HTTP session."""
+        await self.aclose()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared HTTP session, creating it on first use.
+
+        A single session keeps connections to drive.google.com and
+        googleapis.com alive across requests instead of paying a new
+        TCP + TLS handshake per file or folder.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrent,
+                limit_per_host=self.max_concurrent,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=REQUEST_CONNECT_TIMEOUT,
+                sock_read=REQUEST_READ_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP session if it is open."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_with_retry(self, url: str, **kwargs: Any) -> aiohttp.ClientResponse:
+        """
+        Send a GET request, retrying transient failures.
+
+        Connection errors, timeouts and 429/5xx responses are retried up to
+        MAX_RETRIES times with jittered exponential backoff (1, 2, 4, 8, 16s),
+        honoring a numeric Retry-After header when Drive sends one. The
+        response to the last attempt is returned as-is, whatever its status,
+        and a connection error on the last attempt is raised.
+
+        Args:
+            url: Request URL
+            **kwargs: Passed through to ClientSession.get
+
+        Returns:
+            The response, to be used as an async context manager
+        """
+        session = self._get_session()
+        for attempt in range(MAX_RETRIES + 1):
+            last_attempt = attempt == MAX_RETRIES
+            retry_after = None
+            try:
+                response = await session.get(url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise
+                reason = str(e) or type(e).__name__
+            else:
+                if response.status not in RETRY_STATUSES or last_attempt:
+                    return response
+                reason = f"HTTP {response.status}"
+                retry_after = response.headers.get("Retry-After")
+                response.release()
+
+            if retry_after is not None and retry_after.isdigit():
+                delay = min(float(retry_after), MAX_RETRY_AFTER)
+            else:
+                delay = min(MAX_RETRY_DELAY, 2 ** attempt) + random.random()
+            logger.warning(
+                f"🔁 Drive request failed ({reason}), "
+                f"retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})"
+            )
+            await asyncio.sleep(delay)
 
     async def fetch_mcp_config(self, file_id: str) -> list[MCPServerConfig]:
         """
@@ -159,37 +371,160 @@ class DriveClient:
         """
         logger.info(f"Fetching MCP config from Drive file: {file_id}")
 
+        data = await self._download_json(file_id)
+
+        # Extract MCP servers from the config
+        servers = self._extract_servers(data)
+        logger.info(f"Found {len(servers)} MCP servers in config")
+
+        return servers
+
+    async def _download_json(self, file_id: str) -> Any:
+        """
+        Download a public Drive file and parse it as JSON.
+
+        The body is streamed in chunks as bytes and handed straight to orjson,
+        skipping the intermediate UTF-8 decode to str. When a cache directory is configured,
+        downloads are stored with their ETag and revalidated with
+        If-None-Match, so unchanged files come back as an empty 304.
+        Independently of that, a file requested again from the same client
+        within FILE_MEMO_TTL is served from memory without any I/O.
+
+        Args:
+            file_id: Google Drive file ID
+
+        Returns:
+            Parsed JSON data
+
+        Raises:
+            Exception: If the file cannot be fetched or is not JSON.
+        """
+        memo = self._memo.get(file_id)
+        if memo is not None and time.monotonic() - memo[0] < FILE_MEMO_TTL:
+            logger.debug(f"Reusing Drive file fetched earlier: {file_id}")
+            return await _parse_json(memo[1])
+
+        cached = self._read_cache(file_id)
+        if cached is not None:
+            cached_raw, etag, age = cached
+            if age < self.cache_ttl:
+                logger.debug(f"Using cached Drive file: {file_id} (age {age:.0f}s)")
+                data = await _parse_json(cached_raw)
+                self._memo[file_id] = (time.monotonic(), cached_raw)
+                return data
+
         # Build URL for direct file download (public files)
         url = self.DRIVE_DOWNLOAD_URL
         params = {
             "export": "download",
             "id": file_id,
         }
+        headers = {}
+        if cached is not None and etag:
+            headers["If-None-Match"] = etag
+
+        async with await self._get_with_retry(
+            url, params=params, headers=headers, allow_redirects=True
+        ) as response:
+            if response.status == 304 and cached is not None:
+                # Unchanged since the last download: reuse the cached body
+                logger.debug(f"Drive file not modified: {file_id}")
+                self._touch_cache(file_id)
+                data = await _parse_json(cached_raw)
+                self._memo[file_id] = (time.monotonic(), cached_raw)
+                return data
+
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(
+                    f"Failed to fetch file from Drive: {response.status} - {error_text}"
+                )
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, allow_redirects=True) as response:
-                if response.status != 200:
-                    error_text = await response.text()
+            etag = response.headers.get("ETag")
+
+            # Stream the body so an HTML error page is rejected after the
+            # first chunk instead of being downloaded in full
+            buffer = bytearray()
+            sniffed = False
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                buffer += chunk
+                if not sniffed and len(buffer) >= 64:
+                    _check_not_html(buffer)
+                    sniffed = True
+                if len(buffer) > MAX_DOWNLOAD_BYTES:
                     raise Exception(
-                        f"Failed to fetch file from Drive: {response.status} - {error_text}"
+                        f"Drive file exceeds {MAX_DOWNLOAD_BYTES} bytes: {file_id}"
                     )
 
-                content = await response.text()
+        if not sniffed:
+            _check_not_html(buffer)
 
-                # Check if we got an HTML page (usually means file is not public)
-                if content.strip().startswith("<!DOCTYPE") or content.strip().startswith("<html"):
-                    raise Exception(
-                        "Received HTML instead of JSON. "
-                        "Make sure the file is shared as 'Anyone with the link can view'."
-                    )
+        raw = bytes(buffer)
+        data = await _parse_json(raw)
+        self._write_cache(file_id, raw, etag)
+        self._memo[file_id] = (time.monotonic(), raw)
+        return data
 
-                data = json.loads(content)
+    def _cache_paths(self, file_id: str) -> tuple[Path, Path]:
+        """Return the (body, etag) cache file paths for a Drive file."""
+        return (
+            self.cache_dir / f"{file_id}.json",
+            self.cache_dir / f"{file_id}.etag",
+        )
 
-        # Extract MCP servers from the config
-        servers = self._extract_servers(data)
-        logger.info(f"Found {len(servers)} MCP servers in config")
+    def _read_cache(self, file_id: str) -> tuple[bytes, str | None, float] | None:
+        """
+        Load a cached Drive download.
 
-        return servers
+        Returns:
+            (body, etag, age_seconds), or None if caching is disabled or missing
+        """
+        if self.cache_dir is None:
+            return None
+
+        body_path, etag_path = self._cache_paths(file_id)
+        try:
+            raw = body_path.read_bytes()
+            age = time.time() - body_path.stat().st_mtime
+        except OSError:
+            return None
+
+        try:
+            etag = etag_path.read_text(encoding="utf-8").strip() or None
+        except OSError:
+            etag = None
+
+        return raw, etag, age
+
+    def _write_cache(self, file_id: str, raw: bytes, etag: str | None) -> None:
+        """
+        Atomically store a Drive download and its ETag in the cache.
+
+        Config bodies can carry literal API keys in headers, so the cache
+        directory and files are only accessible to the current user.
+        """
+        if self.cache_dir is None:
+            return
+
+        body_path, etag_path = self._cache_paths(file_id)
+        try:
+            self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            for path, content in ((body_path, raw), (etag_path, (etag or "").encode())):
+                tmp_path = path.with_name(f"{path.name}.tmp")
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write Drive cache for {file_id}: {e}")
+
+    def _touch_cache(self, file_id: str) -> None:
+        """Mark a cached Drive download as freshly revalidated."""
+        body_path, _ = self._cache_paths(file_id)
+        try:
+            body_path.touch()
+        except OSError:
+            pass
 
     def _extract_servers(
         self, data: dict[str, Any], source_name: str = ""
@@ -213,6 +548,10 @@ class DriveClient:
 
         mcp_servers = data.get("mcpServers", {})
 
+        # Read once per file instead of once per header ("" = not set, so
+        # normalize_headers does not look it up again)
+        pass_key = os.environ.get("KAMUI_CODE_PASS_KEY", "")
+
         for server_id, server_config in mcp_servers.items():
             if not isinstance(server_config, dict):
                 logger.warning(f"Skipping invalid server config for {server_id}")
@@ -223,16 +562,18 @@ class DriveClient:
                 logger.warning(f"Skipping server {server_id}: no URL provided")
                 continue
 
-            # Expand environment variable placeholders in headers
+            # Expand placeholders and ensure KAMUI-CODE-PASS if env var is set;
+            # the common case of no headers and no pass key needs no work at all
             raw_headers = server_config.get("headers")
-            expanded_headers = expand_headers(raw_headers)
-            # Ensure KAMUI-CODE-PASS header exists if env var is set
-            final_headers = ensure_kamui_pass_header(expanded_headers)
+            if raw_headers is None and not pass_key:
+                headers = None
+            else:
+                headers = normalize_headers(raw_headers, pass_key)
 
             server = MCPServerConfig(
                 id=server_id,
                 url=url,
-                headers=final_headers if final_headers else None,
+                headers=headers,
                 transport=server_config.get("transport", "sse"),
                 source_name=source_name,
             )
@@ -248,7 +589,8 @@ class DriveClient:
 
         Creates a dict mapping server_id to list of configs from different sources.
         The order of configs in the list matches the order of file_configs
-        (last-one-wins priority).
+        (last-one-wins priority). Files without a valid mcpServers object
+        are skipped, and a file ID listed twice is only fetched once.
 
         Args:
             file_configs: List of {"name": "...", "id": "..."} dicts
@@ -256,8 +598,7 @@ class DriveClient:
         Returns:
             Dict mapping server_id to list of MCPServerConfig objects
         """
-        server_candidates: dict[str, list[MCPServerConfig]] = {}
-
+        valid_configs: list[dict[str, str]] = []
         for config in file_configs:
             name = config.get("name", "Unknown")
             file_id = config.get("id", "")
@@ -266,63 +607,49 @@ class DriveClient:
                 logger.warning(f"Skipping {name}: no file ID provided")
                 continue
 
-            try:
-                configs = await self._fetch_mcp_config_with_source(file_id, name)
-                logger.info(f"📂 Loaded {name}: {len(configs)} servers")
-
-                for server_config in configs:
-                    if server_config.id not in server_candidates:
-                        server_candidates[server_config.id] = []
-                    server_candidates[server_config.id].append(server_config)
+            valid_configs.append({"name": name, "id": file_id})
 
-            except Exception as e:
-                logger.warning(f"❌ Failed to fetch {name} ({file_id}): {e}")
-                continue
-
-        total_servers = len(server_candidates)
-        logger.info(f"✅ Total unique servers: {total_servers}")
-        return server_candidates
+        # A file listed more than once is fetched once, at its last
+        # (highest-priority) position
+        unique_configs = dedupe_file_configs(valid_configs)
+        if len(unique_configs) < len(valid_configs):
+            logger.debug(
+                f"Ignoring {len(valid_configs) - len(unique_configs)} repeated file ID(s)"
+            )
+        sources = [(config["name"], config["id"]) for config in unique_configs]
 
-    async def _fetch_mcp_config_with_source(
-        self, file_id: str, source_name: str
-    ) -> list[MCPServerConfig]:
-        """
-        Fetch MCP config from a single file with source name attached.
+        semaphore = asyncio.Semaphore(self.max_concurrent)
 
-        Args:
-            file_id: Google Drive file ID
-            source_name: Label for this source
+        async def fetch_with_limit(name: str, file_id: str) -> list[MCPServerConfig]:
+            async with semaphore:
+                return await self._fetch_and_validate_mcp_file(file_id, name)
 
-        Returns:
-            List of MCPServerConfig with source_name set
-        """
-        logger.debug(f"Fetching MCP config from Drive file: {file_id} ({source_name})")
+        # Download all files concurrently; gather() keeps the input order,
+        # so the last-one-wins priority of file_configs is preserved below.
+        results = await asyncio.gather(
+            *(fetch_with_limit(name, file_id) for name, file_id in sources),
+            return_exceptions=True,
+        )
 
-        url = self.DRIVE_DOWNLOAD_URL
-        params = {
-            "export": "download",
-            "id": file_id,
-        }
+        server_candidates: defaultdict[str, list[MCPServerConfig]] = defaultdict(list)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, allow_redirects=True) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(
-                        f"Failed to fetch file from Drive: {response.status} - {error_text}"
-                    )
+        for (name, file_id), result in zip(sources, results):
+            if isinstance(result, Exception):
+                logger.warning(f"❌ Failed to fetch {name} ({file_id}): {result}")
+                continue
 
-                content = await response.text()
+            if not result:
+                logger.info(f"⏭️ Skipped {name}: no mcpServers")
+                continue
 
-                if content.strip().startswith("<!DOCTYPE") or content.strip().startswith("<html"):
-                    raise Exception(
-                        "Received HTML instead of JSON. "
-                        "Make sure the file is shared as 'Anyone with the link can view'."
-                    )
+            logger.info(f"📂 Loaded {name}: {len(result)} servers")
 
-                data = json.loads(content)
+            for server_config in result:
+                server_candidates[server_config.id].append(server_config)
 
-        return self._extract_servers(data, source_name)
+        total_servers = len(server_candidates)
+        logger.info(f"✅ Total unique servers: {total_servers}")
+        return server_candidates
 
     async def fetch_mcp_configs_from_folder(
         self,
@@ -346,87 +673,166 @@ class DriveClient:
         Returns:
             Dict mapping server_id to list of MCPServerConfig objects
         """
+        file_configs = await self.list_folder_mcp_files(
+            root_folder_id, api_key, min_modified_time
+        )
+        return await self.fetch_mcp_configs_multi(file_configs)
+
+    async def list_folder_mcp_files(
+        self,
+        root_folder_id: str,
+        api_key: str,
+        min_modified_time: str | None = None,
+    ) -> list[dict[str, str]]:
+        """
+        Recursively scan a Google Drive folder for candidate MCP config files.
+
+        Only lists files; nothing is downloaded. The result can be passed to
+        fetch_mcp_configs_multi, which validates the mcpServers structure.
+
+        Args:
+            root_folder_id: Google Drive folder ID to scan
+            api_key: Google API key for Drive API access
+            min_modified_time: ISO format datetime string (default: 2025-11-20T00:00:00)
+
+        Returns:
+            List of {"name": "Auto:<path>", "id": "..."} dicts in scan order
+        """
         if min_modified_time is None:
             min_modified_time = DEFAULT_MIN_MODIFIED_TIME
 
         logger.info(f"🔍 Starting recursive folder scan: {root_folder_id}")
         logger.info(f"📅 Filtering files modified after: {min_modified_time}")
 
-        # Step 1: Recursively scan for candidate files
         found_files = await self._scan_folder_recursive(
             root_folder_id, api_key, min_modified_time
         )
 
         logger.info(f"📁 Found {len(found_files)} candidate JSON file(s)")
 
-        # Step 2: Fetch and validate each file
-        server_candidates: dict[str, list[MCPServerConfig]] = {}
-        valid_count = 0
-
-        for file_item in found_files:
-            file_id = file_item["id"]
-            file_name = file_item["name"]
-            file_path = file_item.get("path", file_name)
-
-            try:
-                # Download and parse the file
-                configs = await self._fetch_and_validate_mcp_file(
-                    file_id, f"Auto:{file_path}"
-                )
-
-                if configs:
-                    valid_count += 1
-                    logger.info(f"✅ Valid: {file_path} ({len(configs)} servers)")
-
-                    for server_config in configs:
-                        if server_config.id not in server_candidates:
-                            server_candidates[server_config.id] = []
-                        server_candidates[server_config.id].append(server_config)
-                else:
-                    logger.debug(f"⏭️ Skipped (no mcpServers): {file_path}")
-
-            except Exception as e:
-                logger.warning(f"⚠️ Skipped invalid file {file_path}: {e}")
-                continue
-
-        total_servers = len(server_candidates)
-        logger.info(f"✅ Folder scan complete: {valid_count} valid files, {total_servers} unique servers")
-        return server_candidates
+        return [
+            {"name": f"Auto:{item.get('path', item['name'])}", "id": item["id"]}
+            for item in found_files
+        ]
 
     async def _scan_folder_recursive(
         self,
         folder_id: str,
         api_key: str,
         min_modified_time: str,
-        current_path: str = "",
     ) -> list[dict[str, Any]]:
         """
         Recursively scan a Google Drive folder for candidate JSON files.
 
-        Uses Drive API v3 with query parameters to filter:
-        - Files with .json extension modified after min_modified_time
-        - Subfolders for recursive traversal
+        The folder tree is walked breadth-first. All folders of one level are
+        listed together with a single files.list query
+        ("'A' in parents or 'B' in parents ..."), which is only split when the
+        query string would get too long; such split batches run concurrently.
+        This needs one round trip per level instead of one per folder.
 
         Args:
             folder_id: Google Drive folder ID to scan
             api_key: Google API key
             min_modified_time: ISO format datetime string for filtering
-            current_path: Current folder path for logging
 
         Returns:
-            List of file metadata dicts with id, name, mimeType, modifiedTime, path
+            List of file metadata dicts with id, name, mimeType, parents, path
         """
         results: list[dict[str, Any]] = []
 
-        # Drive API v3 endpoint
-        url = "https://www.googleapis.com/drive/v3/files"
+        # Folder ID -> path relative to the root folder (for logging)
+        folder_paths: dict[str, str] = {folder_id: ""}
+        level = [folder_id]
+        # Items with several parents are listed once per parent level; the
+        # first sighting wins, which also keeps folder cycles from looping
+        seen_ids: set[str] = {folder_id}
+
+        while level:
+            next_level: list[str] = []
+
+            # Batches of one level are independent, so list them concurrently
+            batch_items = await asyncio.gather(*(
+                self._list_folder_children(batch, api_key, min_modified_time)
+                for batch in self._batch_folder_ids(level)
+            ))
+
+            for items in batch_items:
+                for item in items:
+                    if item["id"] in seen_ids:
+                        # Reached again through another parent folder
+                        continue
+                    seen_ids.add(item["id"])
+
+                    parent_path = next(
+                        (folder_paths[p] for p in item.get("parents", []) if p in folder_paths),
+                        "",
+                    )
+                    item_name = item["name"]
+                    item_path = f"{parent_path}/{item_name}" if parent_path else item_name
+                    item["path"] = item_path
+
+                    if item["mimeType"] == FOLDER_MIME_TYPE:
+                        # Subfolder: scanned with the next level
+                        logger.debug(f"📂 Entering folder: {item_path}")
+                        folder_paths[item["id"]] = item_path
+                        next_level.append(item["id"])
+                    elif _is_json_candidate(item):
+                        # JSON file candidate
+                        results.append(item)
+                    else:
+                        logger.debug(f"⏭️ Skipped (not JSON, {item['mimeType']}): {item_path}")
+
+            level = next_level
+
+        return results
+
+    @staticmethod
+    def _batch_folder_ids(folder_ids: list[str]) -> list[list[str]]:
+        """Split folder IDs into groups whose parents-query stays under MAX_PARENTS_QUERY_LENGTH."""
+        batches: list[list[str]] = []
+        batch: list[str] = []
+        length = 0
+
+        for folder_id in folder_ids:
+            # "'<id>' in parents or "
+            clause_length = len(folder_id) + 18
+            if batch and length + clause_length > MAX_PARENTS_QUERY_LENGTH:
+                batches.append(batch)
+                batch, length = [], 0
+            batch.append(folder_id)
+            length += clause_length
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _list_folder_children(
+        self,
+        folder_ids: list[str],
+        api_key: str,
+        min_modified_time: str,
+    ) -> list[dict[str, Any]]:
+        """
+        List the direct children of several folders with one paged files.list query.
+
+        Only subfolders and JSON files modified after min_modified_time are returned.
+
+        Args:
+            folder_ids: Google Drive folder IDs whose children are listed
+            api_key: Google API key
+            min_modified_time: ISO format datetime string for filtering
 
-        # Query: Items in this folder that are either:
+        Returns:
+            List of file metadata dicts with id, name, mimeType, parents
+        """
+        parents_clause = " or ".join(f"'{fid}' in parents" for fid in folder_ids)
+
+        # Query: Items in these folders that are either:
         # - Folders (for recursion)
         # - JSON files modified after the threshold
         query = (
-            f"'{folder_id}' in parents and trashed = false and ("
-            f"mimeType = 'application/vnd.google-apps.folder' or "
+            f"({parents_clause}) and trashed = false and ("
+            f"mimeType = '{FOLDER_MIME_TYPE}' or "
             f"(name contains '.json' and modifiedTime >= '{min_modified_time}')"
             f")"
         )
@@ -434,49 +840,37 @@ class DriveClient:
         params = {
             "q": query,
             "key": api_key,
-            "fields": "nextPageToken, files(id, name, mimeType, modifiedTime)",
+            # Partial response: only the fields the scan consumes
+            # (modifiedTime is filtered server-side by the query)
+            "fields": "nextPageToken,files(id,name,mimeType,parents)",
             "pageSize": 1000,
         }
 
-        async with aiohttp.ClientSession() as session:
-            page_token = None
-
-            while True:
-                if page_token:
-                    params["pageToken"] = page_token
+        items: list[dict[str, Any]] = []
+        page_token = None
 
-                async with session.get(url, params=params) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise Exception(
-                            f"Drive API error: {response.status} - {error_text}"
-                        )
+        while True:
+            if page_token:
+                params["pageToken"] = page_token
 
-                    data = await response.json()
-
-                files = data.get("files", [])
+            async with await self._get_with_retry(
+                self.DRIVE_FILES_API_URL, params=params
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise Exception(
+                        f"Drive API error: {response.status} - {error_text}"
+                    )
 
-                for item in files:
-                    item_name = item["name"]
-                    item_path = f"{current_path}/{item_name}" if current_path else item_name
-                    item["path"] = item_path
+                data = orjson.loads(await response.read())
 
-                    if item["mimeType"] == "application/vnd.google-apps.folder":
-                        # Recurse into subfolder
-                        logger.debug(f"📂 Entering folder: {item_path}")
-                        sub_results = await self._scan_folder_recursive(
-                            item["id"], api_key, min_modified_time, item_path
-                        )
-                        results.extend(sub_results)
-                    else:
-                        # JSON file candidate
-                        results.append(item)
+            items.extend(data.get("files", []))
 
-                page_token = data.get("nextPageToken")
-                if not page_token:
-                    break
+            page_token = data.get("nextPageToken")
+            if not page_token:
+                break
 
-        return results
+        return items
 
     async def _fetch_and_validate_mcp_file(
         self, file_id: str, source_name: str
@@ -498,30 +892,7 @@ class DriveClient:
         """
         logger.debug(f"Fetching and validating: {file_id} ({source_name})")
 
-        url = self.DRIVE_DOWNLOAD_URL
-        params = {
-            "export": "download",
-            "id": file_id,
-        }
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, allow_redirects=True) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(
-                        f"Failed to fetch file from Drive: {response.status} - {error_text}"
-                    )
-
-                content = await response.text()
-
-                # Check if we got HTML instead of JSON
-                if content.strip().startswith("<!DOCTYPE") or content.strip().startswith("<html"):
-                    raise Exception(
-                        "Received HTML instead of JSON. "
-                        "Make sure the file is shared as 'Anyone with the link can view'."
-                    )
-
-                data = json.loads(content)
+        data = await self._download_json(file_id)
 
         # Validate mcpServers structure
         if not isinstance(data, dict):
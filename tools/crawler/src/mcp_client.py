@@ -1,17 +1,22 @@
 """MCP client for fetching tool schemas from MCP servers."""
 
 import asyncio
+import contextlib
 import logging
+import random
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any
+from urllib.parse import urlsplit
 
 import aiohttp
+import orjson
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolSchema:
     """Schema for a single MCP tool."""
 
@@ -29,48 +34,324 @@ class ToolSchema:
         return result
 
 
-@dataclass
+class MCPHTTPError(Exception):
+    """Non-200 HTTP response from an MCP server."""
+
+    def __init__(self, message: str, status: int, retry_after: str | None = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+# HTTP statuses worth another attempt (rate limiting and gateway trouble)
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Upper bound (seconds) for honoring a server's Retry-After header
+MAX_RETRY_AFTER = 30.0
+
+
+# JSON-RPC requests sent to every server
+INIT_PAYLOAD = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "mcp-catalog-crawler", "version": "1.0.0"},
+    },
+}
+TOOLS_LIST_PAYLOAD = {
+    "jsonrpc": "2.0",
+    "id": 2,
+    "method": "tools/list",
+    "params": {},
+}
+
+
+@dataclass(slots=True)
 class ServerResult:
     """Result of fetching tools from an MCP server."""
 
     id: str
     url: str
-    status: str  # "online", "offline", "error"
+    status: str  # "online", "offline", "error", "skipped" (never written to the catalog)
     last_checked: str
     tools: list[ToolSchema] = field(default_factory=list)
     error_message: str | None = None
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for YAML output (excluding sensitive data like URL)."""
-        result: dict[str, Any] = {
-            "id": self.id,
-            "status": self.status,
-            "last_checked": self.last_checked,
-        }
+        return self.update_into({})
+
+    def update_into(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Overwrite data in place so that it equals to_dict().
+
+        Lets merge_catalogs reuse an existing catalog entry instead of
+        allocating a new one.
+
+        Args:
+            data: Dictionary to update (typically an existing catalog entry).
+
+        Returns:
+            The same dictionary.
+        """
+        data["id"] = self.id
+        data["status"] = self.status
+        data["last_checked"] = self.last_checked
         if self.tools:
-            result["tools"] = [tool.to_dict() for tool in self.tools]
+            data["tools"] = [tool.to_dict() for tool in self.tools]
+        else:
+            data.pop("tools", None)
         if self.error_message:
             # Sanitize error message to remove any URL references
             sanitized_error = self.error_message
             if self.url and self.url in sanitized_error:
                 sanitized_error = sanitized_error.replace(self.url, "[URL]")
-            result["error_message"] = sanitized_error
-        return result
+            data["error_message"] = sanitized_error
+        else:
+            data.pop("error_message", None)
+        # Drop keys to_dict() would not produce (e.g. from older catalogs)
+        for key in data.keys() - SERVER_RESULT_KEYS:
+            del data[key]
+        return data
+
+
+# Keys ServerResult.to_dict() can produce
+SERVER_RESULT_KEYS = frozenset({"id", "status", "last_checked", "tools", "error_message"})
+
+
+class AdmissionController:
+    """
+    Concurrency gate that admits at most `limit` tasks at a time.
+
+    Behaves like asyncio.Semaphore, but the number of admitted tasks is an
+    explicit counter guarded by an asyncio.Condition and can be read from
+    `active`.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Initialize AdmissionController.
+
+        Args:
+            limit: Maximum number of tasks admitted at the same time.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self._limit = limit
+        self._active = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Concurrency limit."""
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        """Number of tasks currently admitted."""
+        return self._active
+
+    async def acquire(self) -> None:
+        """Wait until a slot is free and take it."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self._limit)
+            self._active += 1
+
+    async def release(self) -> None:
+        """Give a slot back and wake one waiting task."""
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify(1)
+
+    async def __aenter__(self) -> "AdmissionController":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
+
+
+class HostRateLimiter:
+    """
+    Per-host rate limiter for starting new server connections.
+
+    Each host gets its own token bucket (implemented as GCRA: every call
+    reserves the next free slot), so a crowded host is throttled without
+    slowing down requests to other hosts. Waiting callers are served in
+    arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        """
+        Initialize HostRateLimiter.
+
+        Args:
+            rate: Allowed requests per second for each host.
+            burst: Requests a host may receive back to back
+                   (default: one second worth of requests).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._interval = 1.0 / rate
+        self._tolerance = (self.burst - 1) * self._interval
+        self._next_slot: dict[str, float] = {}
+
+    async def acquire(self, host: str) -> None:
+        """Wait until the next request to host is allowed."""
+        now = time.monotonic()
+        slot = max(self._next_slot.get(host, now), now)
+        self._next_slot[host] = slot + self._interval
+
+        wait = slot - self._tolerance - now
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker for unreachable MCP hosts.
+
+    closed: requests pass. After `threshold` consecutive connection failures
+    the breaker opens and requests are rejected until `recovery_time` has
+    passed. It is then half-open: one probe request is let through, and its
+    outcome closes the breaker again or re-opens it.
+    """
+
+    def __init__(self, threshold: int = 3, recovery_time: float = 30.0):
+        """
+        Initialize CircuitBreaker.
+
+        Args:
+            threshold: Consecutive connection failures that open the breaker.
+            recovery_time: Seconds to wait before letting a probe through.
+        """
+        self.threshold = threshold
+        self.recovery_time = recovery_time
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.recovery_time:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent (taking the probe slot when half-open)."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record(self, reachable: bool | None) -> None:
+        """
+        Record the outcome of an allowed request.
+
+        Args:
+            reachable: True if the host answered, False on a connection
+                       failure, None if the outcome says nothing about the host.
+        """
+        self._probing = False
+        if reachable is True:
+            self.failures = 0
+            self.opened_at = None
+        elif reachable is False:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
 
 
 class MCPClient:
     """Client for fetching tool schemas from MCP servers via Streamable HTTP."""
 
-    def __init__(self, timeout: float = 60.0, delay: float = 0.5):
+    def __init__(
+        self,
+        timeout: float = 60.0,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 8,
+        rate_limit: float | None = None,
+        retries: int = 3,
+        backoff_base: float = 0.25,
+        breaker_threshold: int = 3,
+        breaker_recovery_time: float = 30.0,
+        connect_timeout: float = 10.0,
+    ):
         """
         Initialize MCPClient.
 
         Args:
             timeout: Timeout in seconds for each server connection.
-            delay: Delay in seconds between requests (to reduce server load).
+            connection_limit: Maximum open connections across all servers.
+            connection_limit_per_host: Maximum open connections to a single host.
+            rate_limit: Maximum server connections started per second for
+                        each host (None = unlimited).
+            retries: Extra attempts after a transient failure (connection
+                     errors and HTTP 429/502/503/504).
+            backoff_base: Initial backoff in seconds, doubled on every retry.
+            breaker_threshold: Servers in a row on one host that must fail to
+                               connect before that host is skipped.
+            breaker_recovery_time: Seconds a host is skipped before it is
+                                   probed again.
+            connect_timeout: Timeout in seconds for opening a TCP connection,
+                             so dead hosts fail long before `timeout`.
         """
         self.timeout = timeout
-        self.delay = delay
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self._connector: aiohttp.TCPConnector | None = None
+        self._rate_limiter = HostRateLimiter(rate_limit) if rate_limit else None
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.breaker_threshold = breaker_threshold
+        self.breaker_recovery_time = breaker_recovery_time
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self.connect_timeout = connect_timeout
+
+    async def __aenter__(self) -> "MCPClient":
+        """Open the shared connection pool."""
+        self._get_connector()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Close the shared connection pool."""
+        await self.aclose()
+
+    def _get_connector(self) -> aiohttp.TCPConnector:
+        """
+        Return the shared connection pool, creating it on first use.
+
+        Every server fetch opens its own ClientSession (so cookies and
+        MCP sessions stay isolated per server) on top of this connector,
+        which lets servers on the same host reuse DNS lookups and
+        keep-alive TLS connections.
+        """
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+            )
+        return self._connector
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool if it is open."""
+        if self._connector is not None and not self._connector.closed:
+            await self._connector.close()
+        self._connector = None
 
     async def fetch_tools_schema(
         self,
@@ -88,42 +369,140 @@ class MCPClient:
 
         Returns:
             ServerResult with status and tool schemas.
+
+        Connection errors (including connect timeouts) and HTTP
+        429/502/503/504 are retried up to self.retries times with full-jitter
+        exponential backoff (a numeric Retry-After header replaces the
+        computed delay). Overall timeouts, other HTTP errors and JSON-RPC
+        errors are not retried.
+
+        Hosts that repeatedly refuse or time out connections are skipped
+        for a while by a per-host CircuitBreaker. Skipped servers get status
+        "skipped", which the YAML generator never writes to the catalog.
+
+        At most connection_limit_per_host fetches run against one host at a
+        time. Later servers wait for a slot before their timeout starts, so
+        queueing for a pooled connection never counts against self.timeout.
         """
+        host = urlsplit(server_url).netloc.lower()
         timestamp = datetime.now(timezone.utc).isoformat()
 
-        try:
-            tools = await asyncio.wait_for(
-                self._fetch_tools(server_url, headers),
-                timeout=self.timeout,
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(
+                self.breaker_threshold, self.breaker_recovery_time
             )
-
+        if not breaker.allow():
+            logger.warning(f"Skipping {server_id} ({server_url}): circuit open for {host}")
+            # The server was never contacted, so this says nothing about it
             return ServerResult(
                 id=server_id,
                 url=server_url,
-                status="online",
+                status="skipped",
                 last_checked=timestamp,
-                tools=tools,
+                error_message="Skipped: host unreachable (circuit open)",
             )
 
-        except asyncio.TimeoutError:
-            logger.warning(f"Timeout connecting to {server_id} ({server_url})")
-            return ServerResult(
-                id=server_id,
-                url=server_url,
-                status="offline",
-                last_checked=timestamp,
-                error_message="Connection timeout",
-            )
+        # True once the host answered, False if it could not be reached
+        reachable: bool | None = None
+        try:
+            for attempt in range(self.retries + 1):
+                reachable = None
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.acquire(host)
+
+                try:
+                    async with self._host_slot(host):
+                        tools = await asyncio.wait_for(
+                            self._fetch_tools(server_url, headers),
+                            timeout=self.timeout,
+                        )
+                    reachable = True
+
+                    return ServerResult(
+                        id=server_id,
+                        url=server_url,
+                        status="online",
+                        last_checked=timestamp,
+                        tools=tools,
+                    )
 
-        except Exception as e:
-            logger.error(f"Error connecting to {server_id} ({server_url}): {e}")
-            return ServerResult(
-                id=server_id,
-                url=server_url,
-                status="error",
-                last_checked=timestamp,
-                error_message=str(e),
-            )
+                except asyncio.TimeoutError as e:
+                    # ServerTimeoutError means the connect itself timed out;
+                    # slow handshakes and cold starts often succeed on retry
+                    error_message = "Connection timeout"
+                    if isinstance(e, aiohttp.ServerTimeoutError):
+                        reachable = False
+                        if attempt < self.retries:
+                            await self._backoff(server_id, attempt, e)
+                            continue
+                        if attempt > 0:
+                            error_message += f" (after {attempt + 1} attempts)"
+                    logger.warning(f"Timeout connecting to {server_id} ({server_url})")
+                    return ServerResult(
+                        id=server_id,
+                        url=server_url,
+                        status="offline",
+                        last_checked=timestamp,
+                        error_message=error_message,
+                    )
+
+                except Exception as e:
+                    if isinstance(e, aiohttp.ClientConnectorError):
+                        reachable = False
+                    elif not isinstance(e, aiohttp.ClientError):
+                        # HTTP status or JSON-RPC error: the host answered
+                        reachable = True
+
+                    retryable = isinstance(
+                        e, (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError)
+                    ) or (isinstance(e, MCPHTTPError) and e.status in RETRY_STATUSES)
+
+                    if retryable and attempt < self.retries:
+                        await self._backoff(server_id, attempt, e)
+                        continue
+
+                    error_message = str(e)
+                    if attempt > 0:
+                        error_message += f" (after {attempt + 1} attempts)"
+                    logger.error(f"Error connecting to {server_id} ({server_url}): {error_message}")
+                    return ServerResult(
+                        id=server_id,
+                        url=server_url,
+                        status="error",
+                        last_checked=timestamp,
+                        error_message=error_message,
+                    )
+        finally:
+            breaker.record(reachable)
+
+    async def _backoff(self, server_id: str, attempt: int, error: Exception) -> None:
+        """Sleep before retrying a failed attempt (Retry-After wins over jitter)."""
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None and retry_after.isdigit():
+            delay = min(float(retry_after), MAX_RETRY_AFTER)
+        else:
+            delay = random.uniform(0, self.backoff_base * 2 ** attempt)
+        logger.debug(
+            f"[{server_id}] Attempt {attempt + 1} failed ({error}), "
+            f"retrying in {delay:.2f}s"
+        )
+        await asyncio.sleep(delay)
+
+    def _host_slot(self, host: str) -> contextlib.AbstractAsyncContextManager:
+        """
+        Return the semaphore that admits fetches to host.
+
+        It is sized like the connector's limit_per_host and each fetch uses
+        one connection at a time, so a fetch holding a slot never waits in
+        the connector queue. A limit of 0 means unlimited, as in aiohttp.
+        """
+        if self.connection_limit_per_host <= 0:
+            return contextlib.nullcontext()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.connection_limit_per_host)
+        return slot
 
     async def _fetch_tools(
         self,
@@ -145,36 +524,34 @@ class MCPClient:
         Returns:
             List of ToolSchema objects.
         """
-        tools: list[ToolSchema] = []
-
         # Prepare headers
         request_headers = {"Content-Type": "application/json"}
         if headers:
             request_headers.update(headers)
 
-        logger.debug(f"Connecting to {server_url} with headers: {list(request_headers.keys())}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Connecting to {server_url} with headers: {list(request_headers.keys())}")
 
-        async with aiohttp.ClientSession() as session:
-            # Step 1: Initialize
-            init_payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {},
-                    "clientInfo": {"name": "mcp-catalog-crawler", "version": "1.0.0"},
-                },
-            }
+        # Bound connection setup separately so an unreachable host fails
+        # with ServerTimeoutError (retried, and counted by the circuit breaker)
+        timeout = aiohttp.ClientTimeout(sock_connect=min(self.timeout, self.connect_timeout))
 
+        async with aiohttp.ClientSession(
+            connector=self._get_connector(), connector_owner=False, timeout=timeout
+        ) as session:
+            # Step 1: Initialize
             async with session.post(
-                server_url, json=init_payload, headers=request_headers
+                server_url, data=orjson.dumps(INIT_PAYLOAD), headers=request_headers
             ) as response:
                 if response.status != 200:
                     error_text = await response.text()
-                    raise Exception(f"Initialize failed: {response.status} - {error_text}")
+                    raise MCPHTTPError(
+                        f"Initialize failed: {response.status} - {error_text}",
+                        response.status,
+                        response.headers.get("Retry-After"),
+                    )
 
-                init_result = await response.json()
+                init_result = orjson.loads(await response.read())
                 if "error" in init_result:
                     raise Exception(f"Initialize error: {init_result['error']}")
 
@@ -187,37 +564,43 @@ class MCPClient:
             logger.debug(f"Initialize successful for {server_url}")
 
             # Step 2: Get tools list
-            tools_payload = {
-                "jsonrpc": "2.0",
-                "id": 2,
-                "method": "tools/list",
-                "params": {},
-            }
-
             async with session.post(
-                server_url, json=tools_payload, headers=request_headers
+                server_url, data=orjson.dumps(TOOLS_LIST_PAYLOAD), headers=request_headers
             ) as response:
                 if response.status != 200:
                     error_text = await response.text()
-                    raise Exception(f"tools/list failed: {response.status} - {error_text}")
+                    raise MCPHTTPError(
+                        f"tools/list failed: {response.status} - {error_text}",
+                        response.status,
+                        response.headers.get("Retry-After"),
+                    )
 
-                tools_result = await response.json()
+                tools_result = orjson.loads(await response.read())
                 if "error" in tools_result:
                     raise Exception(f"tools/list error: {tools_result['error']}")
 
-            # Parse tools from result
-            result_data = tools_result.get("result", {})
-            tools_data = result_data.get("tools", [])
-
-            for tool_data in tools_data:
-                tool_schema = ToolSchema(
-                    name=tool_data.get("name", ""),
-                    description=tool_data.get("description"),
-                    input_schema=tool_data.get("inputSchema"),
-                )
-                tools.append(tool_schema)
+        # Parse tools from result, rejecting malformed payloads with a clear
+        # error instead of an AttributeError deep in the comprehension
+        tools_data = None
+        if isinstance(tools_result, dict):
+            result_data = tools_result.get("result") or {}
+            if isinstance(result_data, dict):
+                tools_data = result_data.get("tools") or []
+        if not isinstance(tools_data, list) or not all(
+            isinstance(tool_data, dict) for tool_data in tools_data
+        ):
+            raise Exception("tools/list error: malformed result")
+
+        tools = [
+            ToolSchema(
+                name=tool_data.get("name", ""),
+                description=tool_data.get("description"),
+                input_schema=tool_data.get("inputSchema"),
+            )
+            for tool_data in tools_data
+        ]
 
-            logger.debug(f"Found {len(tools)} tools at {server_url}")
+        logger.debug(f"Found {len(tools)} tools at {server_url}")
 
         return tools
 
@@ -229,6 +612,9 @@ class MCPClient:
         """
         Fetch tool schemas from multiple MCP servers concurrently.
 
+        Per-host throttling is applied by fetch_tools_schema (rate_limit
+        and connection_limit_per_host), exactly as for single fetches.
+
         Args:
             servers: List of (server_id, server_url, headers) tuples.
             max_concurrent: Maximum concurrent connections (default: 10).
@@ -236,43 +622,46 @@ class MCPClient:
         Returns:
             List of ServerResult objects.
         """
+        # Keep one connection pool alive for the whole batch; close it
+        # afterwards only if it was not already opened by the caller
+        owns_connector = self._connector is None or self._connector.closed
+        self._get_connector()
+
+        # The semaphore bounds servers in flight. It is kept (rather than
+        # relying on the connector limit alone) because each server's
+        # timeout starts when its fetch starts, and waiting in the
+        # connector queue would count against it.
         semaphore = asyncio.Semaphore(max_concurrent)
 
         async def fetch_with_limit(
             server_id: str, server_url: str, headers: dict[str, str] | None
         ) -> ServerResult:
             async with semaphore:
-                result = await self.fetch_tools_schema(server_id, server_url, headers)
-                # Add delay between requests to reduce server load
-                if self.delay > 0:
-                    await asyncio.sleep(self.delay)
-                return result
-
-        tasks = [
-            fetch_with_limit(server_id, server_url, headers)
-            for server_id, server_url, headers in servers
-        ]
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+                return await self.fetch_tools_schema(server_id, server_url, headers)
 
-        # Handle any exceptions that slipped through
-        processed_results: list[ServerResult] = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                server_id, server_url, _ = servers[i]
-                processed_results.append(
-                    ServerResult(
-                        id=server_id,
-                        url=server_url,
-                        status="error",
-                        last_checked=datetime.now(timezone.utc).isoformat(),
-                        error_message=str(result),
+        try:
+            # fetch_tools_schema turns failures into ServerResults, so any
+            # exception here is a real bug or a cancellation and should
+            # cancel the rest of the batch rather than be swallowed
+            if hasattr(asyncio, "TaskGroup"):
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [
+                        tg.create_task(fetch_with_limit(server_id, server_url, headers))
+                        for server_id, server_url, headers in servers
+                    ]
+                results = [task.result() for task in tasks]
+            else:  # Python < 3.11
+                results = await asyncio.gather(
+                    *(
+                        fetch_with_limit(server_id, server_url, headers)
+                        for server_id, server_url, headers in servers
                     )
                 )
-            else:
-                processed_results.append(result)
+        finally:
+            if owns_connector:
+                await self.aclose()
 
-        return processed_results
+        return results
 
     async def fetch_tools_with_fallback(
         self,
@@ -2,23 +2,190 @@
 
 import json
 import logging
+import os
+import re
+import tempfile
+from collections import Counter
 from datetime import datetime, timezone
+from operator import attrgetter, itemgetter
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Callable, Iterable, TypeVar
 
 import yaml
 
-from .mcp_client import ServerResult
+from .mcp_client import ServerResult, ToolSchema
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# C-level sort keys (no Python frame per call like a lambda)
+_ID_ATTR = attrgetter("id")
+_ID_ITEM = itemgetter("id")
+_NAME_ATTR = attrgetter("name")
+
+# Buffer size (bytes) for writing the catalog file
+WRITE_BUFFER_SIZE = 128 * 1024
+
+# Load with the libyaml C backend when PyYAML was built with it. Dumping stays
+# on the Python emitter: libyaml escapes emoji as \U sequences even with
+# allow_unicode, which would rewrite every catalog line containing one.
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+
+class _CatalogDumper(yaml.SafeDumper):
+    """Dumper subclass so the catalog representers don't leak into PyYAML's global ones."""
+
+
+def _str_representer(dumper: yaml.SafeDumper, data: str) -> yaml.ScalarNode:
+    """Represent multi-line strings as literal blocks for cleaner output."""
+    if "\n" in data:
+        return dumper.represent_scalar("tag:yaml.org,2002:str", data, style="|")
+    return dumper.represent_scalar("tag:yaml.org,2002:str", data)
+
+
+_CatalogDumper.add_representer(str, _str_representer)
+
+
+# Keys that can be written unquoted (and don't read back as bool/null in YAML 1.1)
+_PLAIN_KEY_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_.-]*")
+_RESERVED_KEYS = frozenset(
+    {"y", "n", "yes", "no", "on", "off", "true", "false", "null", "~"}
+)
+# Characters that a literal block scalar can't carry safely
+_NON_LITERAL_CHARS = ("\r", "\x85", "\u2028", "\u2029", "\ufeff")
+# Characters json.dumps leaves raw but YAML reads as line breaks (or a BOM)
+# inside double quotes, mapped to their YAML escapes
+_YAML_BREAK_PATTERN = re.compile("[\x85\u2028\u2029\ufeff]")
+_YAML_BREAK_ESCAPES = str.maketrans(
+    {"\x85": "\\N", "\u2028": "\\L", "\u2029": "\\P", "\ufeff": "\\uFEFF"}
+)
+
+
+def _fast_quote(text: str) -> str:
+    """Format text as a YAML double-quoted scalar."""
+    # JSON strings are valid YAML double-quoted scalars, except that YAML
+    # folds a raw NEL / line or paragraph separator into a space
+    quoted = json.dumps(text, ensure_ascii=False)
+    if _YAML_BREAK_PATTERN.search(quoted):
+        quoted = quoted.translate(_YAML_BREAK_ESCAPES)
+    return quoted
+
+
+def _fast_key(key: Any) -> str:
+    """Format a mapping key, quoting it unless it is a safe plain word."""
+    key = str(key)
+    if _PLAIN_KEY_PATTERN.fullmatch(key) and key.lower() not in _RESERVED_KEYS:
+        return key
+    return _fast_quote(key)
+
+
+def _fast_scalar(value: Any, indent: str) -> str:
+    """Format a scalar; multi-line strings become literal blocks indented by indent."""
+    if isinstance(value, str):
+        if (
+            "\n" in value
+            and value[0] not in " \n"
+            and not value.endswith("\n\n")
+            and not any(c in value for c in _NON_LITERAL_CHARS)
+        ):
+            header = "|" if value.endswith("\n") else "|-"
+            lines = value.rstrip("\n").split("\n")
+            return header + "".join(f"\n{indent}{line}" if line else "\n" for line in lines)
+        return _fast_quote(value)
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        if value != value:
+            return ".nan"
+        if value in (float("inf"), float("-inf")):
+            return ".inf" if value > 0 else "-.inf"
+        text = repr(value)
+        # YAML 1.1 floats need a dot: 5e-05 would read back as a string
+        if "." not in text and "e" in text:
+            text = text.replace("e", ".0e", 1)
+        return text
+    return repr(value)
+
+
+def _fast_emit(data: dict[str, Any] | list[Any], indent: str, lines: list[str]) -> None:
+    """Append block-style YAML lines for a dict or list at the given indentation."""
+    items = data.items() if isinstance(data, dict) else ((None, value) for value in data)
+    for key, value in items:
+        prefix = f"{indent}{_fast_key(key)}:" if isinstance(data, dict) else f"{indent}-"
+        if isinstance(value, (dict, list)) and value:
+            if isinstance(data, dict) and isinstance(value, dict):
+                lines.append(prefix)
+                _fast_emit(value, indent + "  ", lines)
+            elif isinstance(data, dict):
+                # Block sequences stay at the key's indentation, like PyYAML
+                lines.append(prefix)
+                _fast_emit(value, indent, lines)
+            else:
+                # The first line of a nested collection shares the "- " line
+                first = len(lines)
+                _fast_emit(value, indent + "  ", lines)
+                lines[first] = f"{prefix} {lines[first][len(indent) + 2:]}"
+        elif isinstance(value, dict):
+            lines.append(f"{prefix} {{}}")
+        elif isinstance(value, list):
+            lines.append(f"{prefix} []")
+        else:
+            lines.append(f"{prefix} {_fast_scalar(value, indent + '  ')}")
+
+
+def _catalog_metadata(statuses: Iterable[str | None]) -> dict[str, Any]:
+    """Build catalog metadata from server statuses ("unknown" counts as error)."""
+    counts = Counter(statuses)
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "total_servers": sum(counts.values()),
+        "online_servers": counts["online"],
+        "offline_servers": counts["offline"],
+        "error_servers": counts["error"] + counts["unknown"],
+    }
+
+
+def _last_per_id(items: list[T], key: Callable[[T], str]) -> list[T]:
+    """Keep only the last item of each run of equal IDs in an ID-sorted list."""
+    return [
+        item for n, item in enumerate(items)
+        if n + 1 == len(items) or key(items[n + 1]) != key(item)
+    ]
+
+
+def _tool_matches(old: dict[str, Any], tool: ToolSchema) -> bool:
+    """Return True if a catalog tool dict equals tool.to_dict(), without building it."""
+    # to_dict() always has "name" and only includes truthy description/inputSchema
+    if len(old) != 1 + bool(tool.description) + bool(tool.input_schema):
+        return False
+    return (
+        "name" in old
+        and old["name"] == tool.name
+        and (not tool.description or old.get("description") == tool.description)
+        and (not tool.input_schema or old.get("inputSchema") == tool.input_schema)
+    )
+
 
 class YAMLGenerator:
     """Generator for MCP tool catalog YAML files."""
 
-    def __init__(self):
-        """Initialize YAMLGenerator."""
-        pass
+    def __init__(self, fast_yaml: bool = False):
+        """
+        Initialize YAMLGenerator.
+
+        Args:
+            fast_yaml: Write catalogs with the built-in block-style writer
+                       instead of PyYAML. Much faster and loads back to the
+                       same data, but quotes every string, so the file text
+                       differs from PyYAML's output.
+        """
+        self.fast_yaml = fast_yaml
 
     def generate_catalog(
         self,
@@ -27,17 +194,14 @@ class YAMLGenerator:
         """
         Generate catalog data from server results.
         """
-        # Sort servers by ID for consistent output
-        sorted_results = sorted(server_results, key=lambda r: r.id)
+        # Sort servers by ID for consistent output. Skipped servers were
+        # never contacted, so there is nothing to report for them.
+        sorted_results = sorted(
+            (r for r in server_results if r.status != "skipped"), key=_ID_ATTR
+        )
 
         catalog: dict[str, Any] = {
-            "metadata": {
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-                "total_servers": len(sorted_results),
-                "online_servers": sum(1 for r in sorted_results if r.status == "online"),
-                "offline_servers": sum(1 for r in sorted_results if r.status == "offline"),
-                "error_servers": sum(1 for r in sorted_results if r.status == "error"),
-            },
+            "metadata": _catalog_metadata(r.status for r in sorted_results),
             "servers": [result.to_dict() for result in sorted_results],
         }
 
@@ -45,16 +209,23 @@ class YAMLGenerator:
 
     def to_yaml_string(self, catalog: dict[str, Any]) -> str:
         """Convert catalog dictionary to YAML string."""
-        # Custom representer for cleaner output
-        def str_representer(dumper: yaml.Dumper, data: str) -> yaml.ScalarNode:
-            if "\n" in data:
-                return dumper.represent_scalar("tag:yaml.org,2002:str", data, style="|")
-            return dumper.represent_scalar("tag:yaml.org,2002:str", data)
-
-        yaml.add_representer(str, str_representer)
+        return self._dump(catalog)
+
+    def _dump(self, catalog: dict[str, Any], stream: IO[str] | None = None) -> str | None:
+        """Dump catalog as YAML to stream, or return it as a string if stream is None."""
+        if self.fast_yaml:
+            lines: list[str] = []
+            _fast_emit(catalog, "", lines)
+            text = "\n".join(lines) + "\n"
+            if stream is None:
+                return text
+            stream.write(text)
+            return None
 
         return yaml.dump(
             catalog,
+            stream,
+            Dumper=_CatalogDumper,
             default_flow_style=False,
             allow_unicode=True,
             sort_keys=False,
@@ -66,11 +237,46 @@ class YAMLGenerator:
         catalog: dict[str, Any],
         output_path: str | Path,
     ) -> None:
-        """Save catalog to YAML file."""
+        """
+        Save catalog to YAML file.
+
+        The YAML is streamed into a temporary file next to output_path and
+        then moved into place, so a failed or interrupted dump leaves the
+        previous catalog intact.
+        """
         output_path = Path(output_path)
-        yaml_content = self.to_yaml_string(catalog)
 
-        output_path.write_text(yaml_content, encoding="utf-8")
+        # Stream straight to the file instead of building the whole string
+        # first; the emitter writes small chunks, so use a larger buffer
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            buffering=WRITE_BUFFER_SIZE,
+            dir=output_path.parent,
+            prefix=f".{output_path.name}.",
+            suffix=".tmp",
+            delete=False,
+        ) as f:
+            tmp_path = Path(f.name)
+            try:
+                self._dump(catalog, f)
+            except BaseException:
+                f.close()
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+        try:
+            # NamedTemporaryFile creates the file as 0600; keep the catalog's
+            # permissions (or the usual 0644 for a new file)
+            try:
+                mode = output_path.stat().st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
         logger.info(f"Catalog saved to {output_path}")
 
     def load_existing_catalog(self, path: str | Path) -> dict[str, Any] | None:
@@ -82,26 +288,31 @@ class YAMLGenerator:
             return None
 
         try:
-            content = path.read_text(encoding="utf-8")
-            catalog = yaml.safe_load(content)
+            # libyaml decodes the UTF-8 bytes itself; no str copy needed
+            catalog = yaml.load(path.read_bytes(), Loader=_SafeLoader)
             logger.info(f"Loaded existing catalog from {path}")
             return catalog
         except Exception as e:
             logger.error(f"Failed to load existing catalog: {e}")
             return None
 
-    def _is_content_changed(self, old_server: dict[str, Any], new_server: dict[str, Any]) -> bool:
+    def _is_content_changed(self, old_server: dict[str, Any], new_result: ServerResult) -> bool:
         """
         Check if the meaningful content (tools) has changed.
         Ignores status, last_checked, and error_message.
+
+        The new result's tools are compared field by field against the
+        catalog dicts, so unchanged servers never go through to_dict().
         """
-        # Tools Check (Deep comparison using JSON serialization for stability)
+        old_tools = old_server.get("tools", [])
+        if len(old_tools) != len(new_result.tools):
+            return True
+
         # Normalize tools list by sorting to ensure order doesn't affect comparison
-        old_tools = sorted(old_server.get("tools", []), key=lambda x: x.get("name", ""))
-        new_tools = sorted(new_server.get("tools", []), key=lambda x: x.get("name", ""))
+        old_tools = sorted(old_tools, key=lambda x: x.get("name", ""))
+        new_tools = sorted(new_result.tools, key=_NAME_ATTR)
 
-        # Use JSON dump to compare deep structures (inputSchema etc.) ignoring specific formatting
-        return json.dumps(old_tools, sort_keys=True) != json.dumps(new_tools, sort_keys=True)
+        return not all(_tool_matches(old, new) for old, new in zip(old_tools, new_tools))
 
     def merge_catalogs(
         self,
@@ -115,69 +326,84 @@ class YAMLGenerator:
         - Only updates entry if 'tools' or 'url' actually changed.
         - Preserves 'last_checked' timestamp if no content change occurred.
         - If the new result is offline/error, keeps the old entry (prevents wiping tool definitions).
+        - Skipped servers keep their old entry, or are left out if they are new.
         - If absolutely no changes across all servers, preserves the original 'generated_at'.
+        - Updated entries are rewritten in place, so existing_catalog's server
+          dicts may be modified.
         """
         if existing_catalog is None:
             return self.generate_catalog(new_results)
 
-        # Build lookup maps
-        new_results_map = {r.id: r for r in new_results}
-        existing_servers_map: dict[str, dict[str, Any]] = {}
-
-        if "servers" in existing_catalog:
-            for server in existing_catalog["servers"]:
-                server_id = server.get("id", "")
-                if server_id:
-                    existing_servers_map[server_id] = server
+        # Bad network day: with no server online every existing entry is kept,
+        # so unless servers were added or removed nothing can change
+        if all(r.status != "online" for r in new_results):
+            existing_ids = {s.get("id") for s in existing_catalog.get("servers") or [] if s.get("id")}
+            if existing_ids == {r.id for r in new_results}:
+                logger.info("No servers online and no servers added or removed. Keeping existing catalog.")
+                return existing_catalog
+
+        # Sort both sides by ID once and walk them in step. Sorting is
+        # stable, so for a repeated ID the last occurrence is the one kept.
+        new_sorted = _last_per_id(sorted(new_results, key=_ID_ATTR), _ID_ATTR)
+        existing_sorted = _last_per_id(
+            sorted(
+                (s for s in existing_catalog.get("servers") or [] if s.get("id")),
+                key=_ID_ITEM,
+            ),
+            _ID_ITEM,
+        )
 
         merged_servers: list[dict[str, Any]] = []
+        removed_ids: list[str] = []
         has_any_change = False
 
-        # 1. Process all new results (updates or new entries)
-        for server_id, new_result_obj in new_results_map.items():
-            new_server_data = new_result_obj.to_dict()
-            existing_server_data = existing_servers_map.get(server_id)
-
-            if existing_server_data:
-                # Case A: Server exists in previous catalog
-                
-                # Check 1: If new result is Offline/Error, don't overwrite valid existing data
-                if new_result_obj.status != "online":
-                    logger.info(f"Server {server_id} is {new_result_obj.status}. Keeping existing entry.")
-                    merged_servers.append(existing_server_data)
-                    continue
+        i = j = 0
+        while i < len(new_sorted) or j < len(existing_sorted):
+            new_id = new_sorted[i].id if i < len(new_sorted) else None
+            existing_id = existing_sorted[j]["id"] if j < len(existing_sorted) else None
 
-                # Check 2: If Online, check if content actually changed
-                if self._is_content_changed(existing_server_data, new_server_data):
-                    logger.info(f"Server {server_id} content changed. Updating.")
-                    merged_servers.append(new_server_data)
-                    has_any_change = True
-                else:
-                    # No content change -> Keep OLD entry (preserves old last_checked)
-                    # logger.debug(f"Server {server_id} unchanged. Keeping existing entry.")
-                    merged_servers.append(existing_server_data)
-            else:
-                # Case B: New server found
-                logger.info(f"New server found: {server_id}")
-                merged_servers.append(new_server_data)
+            if new_id is not None and (existing_id is None or new_id < existing_id):
+                # Case B: New server found (added later if it was skipped)
+                if new_sorted[i].status == "skipped":
+                    logger.info(f"New server {new_id} was skipped. Not adding it yet.")
+                    i += 1
+                    continue
+                logger.info(f"New server found: {new_id}")
+                merged_servers.append(new_sorted[i].to_dict())
                 has_any_change = True
+                i += 1
+                continue
 
-        # 2. Add servers from existing catalog that weren't in new results
-        # (e.g. removed from Drive config, or temporary network partition?)
-        # Current logic: If not in Drive config (new_results), we assume it should be removed?
-        # Or should we keep them? 
-        # Usually, if it's removed from Drive config, it should be removed from Catalog.
-        # But `drive_client` fetches only what's in Drive.
-        # Let's assume: If it's not in new_results (Drive), it is REMOVED.
-        
-        # Check for removed servers to set has_any_change flag correctly
-        for existing_id in existing_servers_map:
-            if existing_id not in new_results_map:
-                logger.info(f"Server removed (not in Drive config): {existing_id}")
+            if new_id is None or existing_id < new_id:
+                # Case C: Server no longer in new results (removed from Drive config)
+                removed_ids.append(existing_id)
                 has_any_change = True
+                j += 1
+                continue
+
+            # Case A: Server exists in previous catalog
+            new_result_obj = new_sorted[i]
+            existing_server_data = existing_sorted[j]
+            i += 1
+            j += 1
+
+            # Check 1: If new result is Offline/Error, don't overwrite valid existing data
+            if new_result_obj.status != "online":
+                logger.info(f"Server {new_id} is {new_result_obj.status}. Keeping existing entry.")
+                merged_servers.append(existing_server_data)
+                continue
+
+            # Check 2: If Online, check if content actually changed
+            if self._is_content_changed(existing_server_data, new_result_obj):
+                logger.info(f"Server {new_id} content changed. Updating.")
+                merged_servers.append(new_result_obj.update_into(existing_server_data))
+                has_any_change = True
+            else:
+                # No content change -> Keep OLD entry (preserves old last_checked)
+                merged_servers.append(existing_server_data)
 
-        # Sort by ID
-        merged_servers.sort(key=lambda s: s.get("id", ""))
+        if removed_ids:
+            logger.info(f"Servers removed (not in Drive config): {removed_ids}")
 
         # 3. Final Decision: Did anything change?
         if not has_any_change:
@@ -185,17 +411,7 @@ class YAMLGenerator:
             return existing_catalog
 
         # If changed, generate new metadata
-        online_count = sum(1 for s in merged_servers if s.get("status") == "online")
-        offline_count = sum(1 for s in merged_servers if s.get("status") == "offline")
-        error_count = sum(1 for s in merged_servers if s.get("status") in ("error", "unknown"))
-
         return {
-            "metadata": {
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-                "total_servers": len(merged_servers),
-                "online_servers": online_count,
-                "offline_servers": offline_count,
-                "error_servers": error_count,
-            },
+            "metadata": _catalog_metadata(s.get("status") for s in merged_servers),
             "servers": merged_servers,
         }
@@ -30,6 +30,9 @@ GitHub Actions で動作しない問題をデバッグするために使用し
 
 import argparse
 import asyncio
+import contextlib
+import functools
+import io
 import json
 import logging
 import os
@@ -37,8 +40,11 @@ import re
 import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import TextIO
 
 import aiohttp
+import orjson
 from dotenv import load_dotenv
 
 # カラー出力用のANSIコード
@@ -52,31 +58,46 @@ class Colors:
     BOLD = "\033[1m"
 
 
-def print_header(text: str) -> None:
+# 各 print_* ヘルパーの固定部分（呼び出しごとに組み立てない）
+# file を渡すとそこへ出力する（並行テストでのサーバーごとのバッファ用）
+_HEADER_RULE = f"{Colors.BOLD}{Colors.BLUE}{'=' * 60}{Colors.RESET}"
+_HEADER_PREFIX = f"\n{_HEADER_RULE}\n{Colors.BOLD}{Colors.BLUE}"
+_HEADER_SUFFIX = f"{Colors.RESET}\n{_HEADER_RULE}\n"
+_SUCCESS_PREFIX = f"{Colors.GREEN}✅ "
+_ERROR_PREFIX = f"{Colors.RED}❌ "
+_WARNING_PREFIX = f"{Colors.YELLOW}⚠️  "
+_INFO_PREFIX = f"{Colors.CYAN}ℹ️  "
+
+
+def print_header(text: str, file: TextIO | None = None) -> None:
     """セクションヘッダーを表示"""
-    print(f"\n{Colors.BOLD}{Colors.BLUE}{'=' * 60}{Colors.RESET}")
-    print(f"{Colors.BOLD}{Colors.BLUE}{text}{Colors.RESET}")
-    print(f"{Colors.BOLD}{Colors.BLUE}{'=' * 60}{Colors.RESET}\n")
+    print(_HEADER_PREFIX, text, _HEADER_SUFFIX, sep="", file=file)
 
 
-def print_success(text: str) -> None:
+def print_success(text: str, file: TextIO | None = None) -> None:
     """成功メッセージを表示"""
-    print(f"{Colors.GREEN}✅ {text}{Colors.RESET}")
+    print(_SUCCESS_PREFIX, text, Colors.RESET, sep="", file=file)
 
 
-def print_error(text: str) -> None:
+def print_error(text: str, file: TextIO | None = None) -> None:
     """エラーメッセージを表示"""
-    print(f"{Colors.RED}❌ {text}{Colors.RESET}")
+    print(_ERROR_PREFIX, text, Colors.RESET, sep="", file=file)
 
 
-def print_warning(text: str) -> None:
+def print_warning(text: str, file: TextIO | None = None) -> None:
     """警告メッセージを表示"""
-    print(f"{Colors.YELLOW}⚠️  {text}{Colors.RESET}")
+    print(_WARNING_PREFIX, text, Colors.RESET, sep="", file=file)
 
 
-def print_info(text: str) -> None:
+def print_info(text: str, file: TextIO | None = None) -> None:
     """情報メッセージを表示"""
-    print(f"{Colors.CYAN}ℹ️  {text}{Colors.RESET}")
+    print(_INFO_PREFIX, text, Colors.RESET, sep="", file=file)
+
+
+def preview_body(body: bytes, limit: int) -> str:
+    """レスポンス本文の先頭 limit 文字だけをデコードして返す"""
+    # UTF-8 は1文字最大4バイトなので、それ以上はデコードしない
+    return body[: limit * 4].decode("utf-8", errors="replace")[:limit]
 
 
 def mask_passkey(value: str, show_chars: int = 4) -> str:
@@ -92,49 +113,104 @@ def mask_passkey(value: str, show_chars: int = 4) -> str:
 # 環境変数展開機能（drive_client.py からコピー）
 # ======================================================================
 
-def expand_env_placeholders(value: str) -> str:
+ENV_PLACEHOLDER_PATTERN = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+
+_MISSING = object()
+
+
+def _getenv_cached(name: str, env_cache: dict[str, str | None] | None) -> str | None:
+    """環境変数を取得する。env_cache があれば1回の展開処理の間は結果を使い回す"""
+    if env_cache is None:
+        return os.environ.get(name)
+    value = env_cache.get(name, _MISSING)
+    if value is _MISSING:
+        value = env_cache[name] = os.environ.get(name)
+    return value
+
+
+def _replace_env_match(
+    match: re.Match, env_cache: dict[str, str | None] | None = None
+) -> str:
+    """Return the environment value for a ${VAR} match, or the placeholder if unset."""
+    env_value = _getenv_cached(match.group(1), env_cache)
+    if env_value is not None:
+        return env_value
+    return match.group(0)
+
+
+def expand_env_placeholders(
+    value: str, env_cache: dict[str, str | None] | None = None
+) -> str:
     """
     Expand environment variable placeholders in a string.
     Supports ${VAR_NAME} syntax.
+
+    env_cache is an optional dict shared across calls so each variable is
+    read from os.environ only once per expansion pass.
     """
     if not value or not isinstance(value, str):
         return value
 
-    def replace_match(match: re.Match) -> str:
-        var_name = match.group(1)
-        env_value = os.environ.get(var_name)
-        if env_value is not None:
-            return env_value
-        return match.group(0)
+    # Most header values have no placeholder; skip the regex engine for them
+    if "${" not in value:
+        return value
 
-    pattern = r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}'
-    return re.sub(pattern, replace_match, value)
+    if env_cache is None:
+        return ENV_PLACEHOLDER_PATTERN.sub(_replace_env_match, value)
+    return ENV_PLACEHOLDER_PATTERN.sub(
+        functools.partial(_replace_env_match, env_cache=env_cache), value
+    )
 
 
-def expand_headers(headers: dict[str, str] | None) -> dict[str, str] | None:
+def expand_headers(
+    headers: dict[str, str] | None,
+    env_cache: dict[str, str | None] | None = None,
+) -> dict[str, str] | None:
     """
     ヘッダー値を展開する。
 
     1. ${VAR} 形式のプレースホルダーを環境変数で展開
     2. KAMUI-CODE-PASS ヘッダーは、環境変数 KAMUI_CODE_PASS_KEY が設定されていれば
        その値で上書き（プレースホルダーでなくても上書き）
+
+    何も変わらない場合はコピーせず、入力の辞書をそのまま返す。
+    env_cache は expand_env_placeholders と同じ（環境変数の読み取りキャッシュ）。
     """
     if headers is None:
         return None
 
-    expanded = {}
-    for key, value in headers.items():
-        # まずプレースホルダーを展開
-        expanded_value = expand_env_placeholders(value)
+    env_passkey = _getenv_cached("KAMUI_CODE_PASS_KEY", env_cache)
+
+    if not any(isinstance(v, str) and "${" in v for v in headers.values()) and not (
+        env_passkey and any(k.upper() == "KAMUI-CODE-PASS" for k in headers)
+    ):
+        return headers
+
+    # プレースホルダーを展開し、KAMUI-CODE-PASS ヘッダーは環境変数で上書き
+    return {
+        key: (
+            env_passkey
+            if env_passkey and key.upper() == "KAMUI-CODE-PASS"
+            else expand_env_placeholders(value, env_cache)
+        )
+        for key, value in headers.items()
+    }
+
 
-        # KAMUI-CODE-PASS ヘッダーは環境変数で上書き
-        if key.upper() == "KAMUI-CODE-PASS":
-            env_passkey = os.environ.get("KAMUI_CODE_PASS_KEY")
-            if env_passkey:
-                expanded_value = env_passkey
+def _expand_server_headers(
+    server_config: dict,
+    env_passkey: str | None,
+    env_cache: dict[str, str | None],
+) -> dict[str, str]:
+    """1サーバー分の headers を展開し、KAMUI-CODE-PASS がなければ追加したものを返す"""
+    # headersを展開（headersがない場合は作成）
+    headers = expand_headers(server_config.get("headers", {}), env_cache)
 
-        expanded[key] = expanded_value
-    return expanded
+    # KAMUI-CODE-PASS がない場合は追加（大文字小文字を無視してチェック）
+    if env_passkey and not any(k.upper() == "KAMUI-CODE-PASS" for k in headers):
+        headers = {**headers, "KAMUI-CODE-PASS": env_passkey}
+    return headers
 
 
 def expand_mcp_config(config: dict) -> dict:
@@ -150,36 +226,51 @@ def expand_mcp_config(config: dict) -> dict:
         config: 元のMCP設定辞書
 
     Returns:
-        展開後のMCP設定辞書（ディープコピー）
+        展開後のMCP設定辞書（書き換えるサーバー設定と headers だけをコピーし、
+        元の config は変更しない）。書き換えるものが何もない場合は config をそのまま返す
     """
-    import copy
-    expanded_config = copy.deepcopy(config)
-
-    env_passkey = os.environ.get("KAMUI_CODE_PASS_KEY")
-
-    mcp_servers = expanded_config.get("mcpServers", {})
-    for server_id, server_config in mcp_servers.items():
+    # 同じ変数（KAMUI_CODE_PASS_KEY など）を全サーバーで参照するため、
+    # os.environ の読み取り結果はこの展開処理の間キャッシュする
+    env_cache: dict[str, str | None] = {}
+    env_passkey = _getenv_cached("KAMUI_CODE_PASS_KEY", env_cache)
+
+    # プレースホルダーも追加するヘッダーもなければ、コピーせずに返す
+    server_configs = [
+        sc for sc in config.get("mcpServers", {}).values() if isinstance(sc, dict)
+    ]
+    if not env_passkey and all(
+        isinstance(sc.get("headers"), dict)
+        and not any(isinstance(v, str) and "${" in v for v in sc["headers"].values())
+        for sc in server_configs
+    ):
+        return config
+
+    expanded_config = dict(config)
+    mcp_servers = {}
+    for server_id, server_config in config.get("mcpServers", {}).items():
         if isinstance(server_config, dict):
-            # headersがない場合は作成
-            if "headers" not in server_config:
-                server_config["headers"] = {}
-
-            # headersを展開
-            server_config["headers"] = expand_headers(server_config["headers"])
-
-            # KAMUI-CODE-PASS がない場合は追加
-            if env_passkey:
-                headers = server_config["headers"]
-                # 大文字小文字を無視してチェック
-                has_kamui_pass = any(
-                    k.upper() == "KAMUI-CODE-PASS" for k in headers.keys()
-                )
-                if not has_kamui_pass:
-                    headers["KAMUI-CODE-PASS"] = env_passkey
+            server_config = {
+                **server_config,
+                "headers": _expand_server_headers(server_config, env_passkey, env_cache),
+            }
+        mcp_servers[server_id] = server_config
 
+    if "mcpServers" in config:
+        expanded_config["mcpServers"] = mcp_servers
     return expanded_config
 
 
+# 表示時にマスクするヘッダー名に含まれるキーワード
+SENSITIVE_HEADER_KEYWORDS = ("PASS", "KEY", "AUTH", "TOKEN", "SECRET")
+_SENSITIVE_RE = re.compile("|".join(SENSITIVE_HEADER_KEYWORDS))
+
+
+@functools.lru_cache(maxsize=None)
+def is_sensitive_header(key: str) -> bool:
+    """認証関連のヘッダー名かどうか（同じヘッダー名の判定はキャッシュする）"""
+    return _SENSITIVE_RE.search(key.upper()) is not None
+
+
 def mask_sensitive_values(config: dict) -> dict:
     """
     機密情報をマスクしたMCP設定を返す（表示用）
@@ -190,21 +281,62 @@ def mask_sensitive_values(config: dict) -> dict:
     Returns:
         機密情報がマスクされた辞書
     """
-    import copy
-    masked_config = copy.deepcopy(config)
+    masked_config = dict(config)
+    if "mcpServers" not in config:
+        return masked_config
 
-    mcp_servers = masked_config.get("mcpServers", {})
-    for server_id, server_config in mcp_servers.items():
+    masked_config["mcpServers"] = mcp_servers = {}
+    for server_id, server_config in config["mcpServers"].items():
         if isinstance(server_config, dict) and "headers" in server_config:
-            headers = server_config["headers"]
-            for key, value in headers.items():
-                # 認証関連のヘッダーをマスク
-                if any(keyword in key.upper() for keyword in ["PASS", "KEY", "AUTH", "TOKEN", "SECRET"]):
-                    headers[key] = mask_passkey(value)
+            # 認証関連のヘッダーをマスク（書き換えるサーバー設定と headers だけコピー）
+            server_config = {**server_config, "headers": _mask_headers(server_config["headers"])}
+        mcp_servers[server_id] = server_config
 
     return masked_config
 
 
+def _mask_headers(headers: dict[str, str]) -> dict[str, str]:
+    """認証関連のヘッダー値をマスクしたコピーを返す"""
+    return {
+        key: mask_passkey(value) if is_sensitive_header(key) else value
+        for key, value in headers.items()
+    }
+
+
+def expand_and_mask(config: dict) -> tuple[dict, dict]:
+    """
+    環境変数の展開と表示用のマスクを1回の走査で行う
+
+    expand_mcp_config(config) と mask_sensitive_values(その結果) を
+    続けて呼ぶのと同じ結果を、mcpServers を1回たどるだけで作る。
+
+    Args:
+        config: 元のMCP設定辞書（変更しない）
+
+    Returns:
+        (展開後のMCP設定辞書, 展開後の値をマスクした表示用の辞書)
+    """
+    env_cache: dict[str, str | None] = {}
+    env_passkey = _getenv_cached("KAMUI_CODE_PASS_KEY", env_cache)
+
+    expanded_config = dict(config)
+    masked_config = dict(config)
+    if "mcpServers" not in config:
+        return expanded_config, masked_config
+
+    expanded_config["mcpServers"] = expanded_servers = {}
+    masked_config["mcpServers"] = masked_servers = {}
+    for server_id, server_config in config["mcpServers"].items():
+        if isinstance(server_config, dict):
+            headers = _expand_server_headers(server_config, env_passkey, env_cache)
+            expanded_servers[server_id] = {**server_config, "headers": headers}
+            masked_servers[server_id] = {**server_config, "headers": _mask_headers(headers)}
+        else:
+            expanded_servers[server_id] = masked_servers[server_id] = server_config
+
+    return expanded_config, masked_config
+
+
 # ======================================================================
 # テスト機能
 # ======================================================================
@@ -301,12 +433,36 @@ def test_env_expansion() -> bool:
     return all_passed
 
 
+# 接続テストで送る JSON-RPC リクエスト（内容は固定なので送信用のバイト列も一度だけ作る）
+INIT_PAYLOAD = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "passkey-tester", "version": "1.0.0"},
+    },
+}
+TOOLS_LIST_PAYLOAD = {
+    "jsonrpc": "2.0",
+    "id": 2,
+    "method": "tools/list",
+    "params": {},
+}
+INIT_PAYLOAD_BYTES = orjson.dumps(INIT_PAYLOAD)
+TOOLS_LIST_PAYLOAD_BYTES = orjson.dumps(TOOLS_LIST_PAYLOAD)
+
+# 全リクエスト共通のヘッダー（テストごとにコピーして使う）
+BASE_HEADERS = {"Content-Type": "application/json"}
+
+
 @dataclass
 class ConnectionTestResult:
     """接続テスト結果"""
     success: bool
     status_code: int | None = None
-    response_body: str | None = None
+    response_body: bytes | None = None
     error_message: str | None = None
     headers_sent: dict[str, str] | None = None
     session_id: str | None = None
@@ -320,11 +476,19 @@ async def test_mcp_connection(
     verbose: bool = False,
     dry_run: bool = False,
     custom_headers: dict[str, str] | None = None,
+    session: aiohttp.ClientSession | None = None,
+    out: TextIO | None = None,
 ) -> ConnectionTestResult:
-    """MCP サーバー接続テスト"""
+    """
+    MCP サーバー接続テスト
+
+    session を渡すとその接続プールを再利用する（複数サーバーのテスト用）。
+    省略時はこのテスト専用のセッションを作成して閉じる。
+    out を渡すと表示をそこへ書き込む（省略時は標準出力）。
+    """
 
     # ヘッダーの構築
-    headers = {"Content-Type": "application/json"}
+    headers = BASE_HEADERS.copy()
 
     # カスタムヘッダーが指定されている場合はそれを使用
     if custom_headers:
@@ -339,79 +503,73 @@ async def test_mcp_connection(
 
     # ドライランモード
     if dry_run:
-        print_info("ドライランモード - 実際の接続は行いません")
-        print()
-        print("送信予定のヘッダー:")
+        print_info("ドライランモード - 実際の接続は行いません", file=out)
+        print(file=out)
+        print("送信予定のヘッダー:", file=out)
         for k, v in headers.items():
             display_v = mask_passkey(v) if k == "KAMUI-CODE-PASS" else v
-            print(f"  {k}: {display_v}")
-        print()
-        print(f"接続先URL: {server_url}")
+            print(f"  {k}: {display_v}", file=out)
+        print(file=out)
+        print(f"接続先URL: {server_url}", file=out)
         return ConnectionTestResult(
             success=True,
             headers_sent=headers,
         )
 
     # 実際の接続テスト
-    print_info(f"接続テスト開始: {server_url}")
+    print_info(f"接続テスト開始: {server_url}", file=out)
 
     if verbose:
-        print()
-        print("送信ヘッダー:")
+        print(file=out)
+        print("送信ヘッダー:", file=out)
         for k, v in headers.items():
             display_v = mask_passkey(v) if k == "KAMUI-CODE-PASS" else v
-            print(f"  {k}: {display_v}")
-        print()
+            print(f"  {k}: {display_v}", file=out)
+        print(file=out)
+
+    # Initialize と tools/list の両方で同じタイムアウト設定を使う
+    request_timeout = aiohttp.ClientTimeout(total=timeout)
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with (
+            contextlib.nullcontext(session) if session is not None else aiohttp.ClientSession()
+        ) as session:
             # Step 1: Initialize
-            init_payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {},
-                    "clientInfo": {"name": "passkey-tester", "version": "1.0.0"},
-                },
-            }
-
             if verbose:
-                print_info("Step 1: Initialize リクエスト送信...")
-                print(f"  Payload: {json.dumps(init_payload, indent=2)}")
+                print_info("Step 1: Initialize リクエスト送信...", file=out)
+                print(f"  Payload: {orjson.dumps(INIT_PAYLOAD, option=orjson.OPT_INDENT_2).decode()}", file=out)
 
             async with session.post(
                 server_url,
-                json=init_payload,
+                data=INIT_PAYLOAD_BYTES,
                 headers=headers,
-                timeout=aiohttp.ClientTimeout(total=timeout),
+                timeout=request_timeout,
             ) as response:
                 status_code = response.status
-                response_text = await response.text()
+                response_body = await response.read()
 
                 if verbose:
-                    print(f"  Response Status: {status_code}")
-                    print(f"  Response Headers: {dict(response.headers)}")
-                    print(f"  Response Body: {response_text[:500]}...")
+                    print(f"  Response Status: {status_code}", file=out)
+                    print(f"  Response Headers: {dict(response.headers)}", file=out)
+                    print(f"  Response Body: {preview_body(response_body, 500)}...", file=out)
 
                 if status_code != 200:
                     return ConnectionTestResult(
                         success=False,
                         status_code=status_code,
-                        response_body=response_text,
+                        response_body=response_body,
                         error_message=f"Initialize failed: HTTP {status_code}",
                         headers_sent=headers,
                     )
 
-                init_result = json.loads(response_text)
+                init_result = orjson.loads(response_body)
 
                 if "error" in init_result:
                     error_info = init_result["error"]
                     return ConnectionTestResult(
                         success=False,
                         status_code=status_code,
-                        response_body=response_text,
+                        response_body=response_body,
                         error_message=f"Initialize error: {error_info}",
                         headers_sent=headers,
                     )
@@ -421,51 +579,44 @@ async def test_mcp_connection(
                 if session_id:
                     headers["Mcp-Session-Id"] = session_id
                     if verbose:
-                        print_success(f"Session ID 取得: {session_id}")
+                        print_success(f"Session ID 取得: {session_id}", file=out)
 
             # Step 2: tools/list
-            tools_payload = {
-                "jsonrpc": "2.0",
-                "id": 2,
-                "method": "tools/list",
-                "params": {},
-            }
-
             if verbose:
-                print()
-                print_info("Step 2: tools/list リクエスト送信...")
+                print(file=out)
+                print_info("Step 2: tools/list リクエスト送信...", file=out)
 
             async with session.post(
                 server_url,
-                json=tools_payload,
+                data=TOOLS_LIST_PAYLOAD_BYTES,
                 headers=headers,
-                timeout=aiohttp.ClientTimeout(total=timeout),
+                timeout=request_timeout,
             ) as response:
                 status_code = response.status
-                response_text = await response.text()
+                response_body = await response.read()
 
                 if verbose:
-                    print(f"  Response Status: {status_code}")
-                    print(f"  Response Body: {response_text[:500]}...")
+                    print(f"  Response Status: {status_code}", file=out)
+                    print(f"  Response Body: {preview_body(response_body, 500)}...", file=out)
 
                 if status_code != 200:
                     return ConnectionTestResult(
                         success=False,
                         status_code=status_code,
-                        response_body=response_text,
+                        response_body=response_body,
                         error_message=f"tools/list failed: HTTP {status_code}",
                         headers_sent=headers,
                         session_id=session_id,
                     )
 
-                tools_result = json.loads(response_text)
+                tools_result = orjson.loads(response_body)
 
                 if "error" in tools_result:
                     error_info = tools_result["error"]
                     return ConnectionTestResult(
                         success=False,
                         status_code=status_code,
-                        response_body=response_text,
+                        response_body=response_body,
                         error_message=f"tools/list error: {error_info}",
                         headers_sent=headers,
                         session_id=session_id,
@@ -478,7 +629,7 @@ async def test_mcp_connection(
                 return ConnectionTestResult(
                     success=True,
                     status_code=status_code,
-                    response_body=response_text,
+                    response_body=response_body,
                     headers_sent=headers,
                     session_id=session_id,
                     tools_count=len(tools),
@@ -510,6 +661,24 @@ async def test_mcp_connection(
         )
 
 
+# .env 内の KAMUI_CODE_PASS_KEY 行（group(1) は "=" 以降の値）
+ENV_FILE_PASS_KEY_PATTERN = re.compile(
+    r"^[ \t]*KAMUI_CODE_PASS_KEY[ \t]*(?:=(.*))?$", re.MULTILINE
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_env_file(path: str, mtime: float) -> str:
+    """
+    .env ファイルの内容を読み込む
+
+    mtime をキャッシュキーに含めるので、同じプロセスで繰り返しテストしても
+    ファイルが更新されない限り読み直さない。
+    """
+    with open(path, "r") as f:
+        return f.read()
+
+
 def load_mcp_config(config_path: str) -> dict:
     """
     ローカルのMCP設定JSONファイルを読み込む
@@ -520,8 +689,7 @@ def load_mcp_config(config_path: str) -> dict:
     Returns:
         パースされたJSON辞書
     """
-    with open(config_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return orjson.loads(Path(config_path).read_bytes())
 
 
 async def test_from_config_file(
@@ -531,6 +699,7 @@ async def test_from_config_file(
     verbose: bool = False,
     dry_run: bool = False,
     output_path: str | None = None,
+    max_concurrent: int = 10,
 ) -> bool:
     """
     ローカルJSONファイルからMCPサーバー設定を読み込んでテスト
@@ -548,6 +717,7 @@ async def test_from_config_file(
         verbose: 詳細ログ
         dry_run: ドライラン
         output_path: 展開後のJSONを出力するパス（Noneの場合は出力しない）
+        max_concurrent: 同時に接続テストするサーバー数の上限
 
     Returns:
         全テスト成功ならTrue
@@ -565,20 +735,15 @@ async def test_from_config_file(
         print_info(f".env ファイルが存在します: {env_file_path}")
         # .env の中身を確認（値は表示しない）
         try:
-            with open(env_file_path, "r") as f:
-                env_content = f.read()
-                if "KAMUI_CODE_PASS_KEY" in env_content:
-                    # 値が空かどうか確認
-                    for line in env_content.splitlines():
-                        if line.strip().startswith("KAMUI_CODE_PASS_KEY"):
-                            parts = line.split("=", 1)
-                            if len(parts) == 2 and parts[1].strip():
-                                print_success(".env に KAMUI_CODE_PASS_KEY が設定されています")
-                            else:
-                                print_warning(".env の KAMUI_CODE_PASS_KEY が空です!")
-                            break
-                else:
-                    print_info(".env に KAMUI_CODE_PASS_KEY は含まれていません")
+            env_content = _read_env_file(env_file_path, os.path.getmtime(env_file_path))
+            match = ENV_FILE_PASS_KEY_PATTERN.search(env_content)
+            if match is None:
+                print_info(".env に KAMUI_CODE_PASS_KEY は含まれていません")
+            # 値が空かどうか確認
+            elif match.group(1) and match.group(1).strip():
+                print_success(".env に KAMUI_CODE_PASS_KEY が設定されています")
+            else:
+                print_warning(".env の KAMUI_CODE_PASS_KEY が空です!")
         except Exception as e:
             print_warning(f".env ファイル読み込みエラー: {e}")
     else:
@@ -624,29 +789,33 @@ async def test_from_config_file(
     # ========================================
     print_info("Step 2: 環境変数プレースホルダーを展開")
 
-    expanded_config = expand_mcp_config(original_config)
+    # 展開前後の比較を表示（展開結果を確認する --dry-run / --verbose のときのみ）
+    if verbose or dry_run:
+        # 展開と表示用のマスクは1回の走査でまとめて行う
+        expanded_config, masked_expanded = expand_and_mask(original_config)
 
-    # 展開前後の比較を表示
-    print()
-    print_info("展開前のJSON:")
-    masked_original = mask_sensitive_values(original_config)
-    print(json.dumps(masked_original, indent=2, ensure_ascii=False))
+        print()
+        print_info("展開前のJSON:")
+        masked_original = mask_sensitive_values(original_config)
+        print(orjson.dumps(masked_original, option=orjson.OPT_INDENT_2).decode())
 
-    print()
-    print_info("展開後のJSON:")
-    masked_expanded = mask_sensitive_values(expanded_config)
-    print(json.dumps(masked_expanded, indent=2, ensure_ascii=False))
+        print()
+        print_info("展開後のJSON:")
+        print(orjson.dumps(masked_expanded, option=orjson.OPT_INDENT_2).decode())
+    else:
+        expanded_config = expand_mcp_config(original_config)
 
-    # 未展開のプレースホルダーがないか確認
+    # 未展開のプレースホルダーがないか確認（dict のサーバーには headers が必ずある）
     unexpanded_found = False
-    for server_id, server_config in expanded_config.get("mcpServers", {}).items():
-        if isinstance(server_config, dict) and "headers" in server_config:
-            for key, value in server_config["headers"].items():
-                if isinstance(value, str) and "${" in value:
-                    if not unexpanded_found:
-                        print()
-                    print_warning(f"未展開のプレースホルダー: [{server_id}] {key}={value}")
-                    unexpanded_found = True
+    for server_id, server_config in expanded_config["mcpServers"].items():
+        if not isinstance(server_config, dict):
+            continue
+        for key, value in server_config["headers"].items():
+            if isinstance(value, str) and "${" in value:
+                if not unexpanded_found:
+                    print()
+                print_warning(f"未展開のプレースホルダー: [{server_id}] {key}={value}")
+                unexpanded_found = True
 
     if unexpanded_found:
         print_info("対応する環境変数が設定されているか確認してください")
@@ -660,8 +829,9 @@ async def test_from_config_file(
         print_info(f"Step 3: 展開後のJSONを出力")
         print(f"  出力先: {output_path}")
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(expanded_config, f, indent=2, ensure_ascii=False)
+            Path(output_path).write_bytes(
+                orjson.dumps(expanded_config, option=orjson.OPT_INDENT_2)
+            )
             print_success("JSONファイル出力完了")
             print_warning("注意: 出力ファイルには展開された認証情報が含まれています")
         except Exception as e:
@@ -692,32 +862,32 @@ async def test_from_config_file(
     else:
         servers_to_test = expanded_servers
 
-    # 各サーバーをテスト
-    all_success = True
-    results = []
-
-    for server_id, server_config in servers_to_test.items():
-        print()
-        print_header(f"接続テスト: {server_id}")
+    # 各サーバーを並行してテスト（DNS・TCP/TLS接続は全サーバーで共有する）
+    async def test_one(
+        session: aiohttp.ClientSession,
+        server_id: str,
+        server_config: dict,
+        out: TextIO,
+    ) -> tuple[str, bool, str]:
+        print(file=out)
+        print_header(f"接続テスト: {server_id}", file=out)
 
         url = server_config.get("url")
         if not url:
-            print_error("URL が設定されていません")
-            all_success = False
-            results.append((server_id, False, "URL未設定"))
-            continue
+            print_error("URL が設定されていません", file=out)
+            return (server_id, False, "URL未設定")
 
         # 展開済みのヘッダーを使用
         headers = server_config.get("headers", {})
 
-        print_info(f"URL: {url}")
+        print_info(f"URL: {url}", file=out)
         if headers:
-            print_info("ヘッダー (展開済み):")
+            print_info("ヘッダー (展開済み):", file=out)
             for k, v in headers.items():
-                if any(kw in k.upper() for kw in ["PASS", "KEY", "AUTH", "TOKEN", "SECRET"]):
-                    print(f"  {k}: {mask_passkey(v)}")
+                if is_sensitive_header(k):
+                    print(f"  {k}: {mask_passkey(v)}", file=out)
                 else:
-                    print(f"  {k}: {v}")
+                    print(f"  {k}: {v}", file=out)
 
         result = await test_mcp_connection(
             server_url=url,
@@ -726,15 +896,40 @@ async def test_from_config_file(
             verbose=verbose,
             dry_run=False,
             custom_headers=headers if headers else None,
+            session=session,
+            out=out,
         )
 
         if result.success:
-            print_success(f"接続成功! ツール数: {result.tools_count}")
-            results.append((server_id, True, f"ツール数: {result.tools_count}"))
-        else:
-            print_error(f"接続失敗: {result.error_message}")
-            all_success = False
-            results.append((server_id, False, result.error_message))
+            print_success(f"接続成功! ツール数: {result.tools_count}", file=out)
+            return (server_id, True, f"ツール数: {result.tools_count}")
+        print_error(f"接続失敗: {result.error_message}", file=out)
+        return (server_id, False, result.error_message)
+
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def run_one(
+        session: aiohttp.ClientSession, server_id: str, server_config: dict
+    ) -> tuple[str, bool, str]:
+        # サーバーごとの出力をためておき、完了時にまとめて書き出す
+        buffer = io.StringIO()
+        try:
+            async with semaphore:
+                return await test_one(session, server_id, server_config, buffer)
+        finally:
+            sys.stdout.write(buffer.getvalue())
+
+    # 同時接続数は --max-concurrent のみで制御する（ホスト単位の上限は設けない）
+    connector = aiohttp.TCPConnector(limit=max_concurrent, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        results = await asyncio.gather(
+            *(
+                run_one(session, server_id, server_config)
+                for server_id, server_config in servers_to_test.items()
+            )
+        )
+
+    all_success = all(success for _, success, _ in results)
 
     # サマリー
     print()
@@ -742,13 +937,16 @@ async def test_from_config_file(
     success_count = sum(1 for _, success, _ in results if success)
     fail_count = len(results) - success_count
 
-    print(f"成功: {success_count} / {len(results)}")
-    print(f"失敗: {fail_count} / {len(results)}")
-    print()
-
+    # サマリーはまとめて1回で出力する
+    lines = [
+        f"成功: {success_count} / {len(results)}",
+        f"失敗: {fail_count} / {len(results)}",
+        "",
+    ]
     for server_id, success, message in results:
         status = f"{Colors.GREEN}✅{Colors.RESET}" if success else f"{Colors.RED}❌{Colors.RESET}"
-        print(f"  {status} {server_id}: {message}")
+        lines.append(f"  {status} {server_id}: {message}")
+    print("\n".join(lines))
 
     return all_success
 
@@ -800,7 +998,7 @@ async def run_connection_test(args: argparse.Namespace) -> bool:
         if result.response_body and args.verbose:
             print()
             print_info("レスポンス本文:")
-            print(result.response_body[:1000])
+            print(preview_body(result.response_body, 1000))
 
         # デバッグヒント
         print()
@@ -824,6 +1022,31 @@ async def run_connection_test(args: argparse.Namespace) -> bool:
         return False
 
 
+async def run_network_tests(args: argparse.Namespace) -> bool:
+    """--config と --server-url の接続テストを同じイベントループで順に実行"""
+    success = True
+
+    # JSONファイルからのテスト
+    if args.config:
+        if not await test_from_config_file(
+            config_path=args.config,
+            server_filter=args.server,
+            timeout=args.timeout,
+            verbose=args.verbose,
+            dry_run=args.dry_run,
+            output_path=args.output,
+            max_concurrent=args.max_concurrent,
+        ):
+            success = False
+
+    # 直接URL指定での接続テスト
+    if args.server_url:
+        if not await run_connection_test(args):
+            success = False
+
+    return success
+
+
 def parse_args() -> argparse.Namespace:
     """コマンドライン引数をパース"""
     parser = argparse.ArgumentParser(
@@ -890,6 +1113,13 @@ def parse_args() -> argparse.Namespace:
         help="接続タイムアウト秒数（デフォルト: 30）",
     )
 
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=10,
+        help="--config で同時にテストするサーバー数（デフォルト: 10）",
+    )
+
     parser.add_argument(
         "--verbose",
         "-v",
@@ -941,21 +1171,9 @@ def main() -> int:
         if not test_env_expansion():
             success = False
 
-    # JSONファイルからのテスト
-    if args.config:
-        if not asyncio.run(test_from_config_file(
-            config_path=args.config,
-            server_filter=args.server,
-            timeout=args.timeout,
-            verbose=args.verbose,
-            dry_run=args.dry_run,
-            output_path=args.output,
-        )):
-            success = False
-
-    # 直接URL指定での接続テスト
-    if args.server_url:
-        if not asyncio.run(run_connection_test(args)):
+    # JSONファイル / 直接URL指定での接続テスト（イベントループは1回だけ起動する）
+    if args.config or args.server_url:
+        if not asyncio.run(run_network_tests(args)):
             success = False
 
     print()
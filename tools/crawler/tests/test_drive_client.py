@@ -0,0 +1,103 @@
+"""Tests for the Google Drive client's retry and cache logic."""
+
+import os
+import stat
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from src.drive_client import MAX_RETRIES, DriveClient
+
+
+def fake_response(status: int, headers: dict[str, str] | None = None) -> mock.Mock:
+    return mock.Mock(status=status, headers=headers or {})
+
+
+class GetWithRetryTest(unittest.IsolatedAsyncioTestCase):
+    """_get_with_retry makes at most MAX_RETRIES + 1 requests."""
+
+    def setUp(self) -> None:
+        self.client = DriveClient()
+        self.client._session = mock.Mock(closed=False)
+        patcher = mock.patch("src.drive_client.asyncio.sleep", mock.AsyncMock())
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_returns_last_response_when_retries_run_out(self) -> None:
+        responses = [fake_response(503) for _ in range(MAX_RETRIES + 1)]
+        self.client._session.get = mock.AsyncMock(side_effect=responses)
+
+        response = await self.client._get_with_retry("https://drive.example/uc")
+
+        self.assertIs(response, responses[-1])
+        self.assertEqual(self.client._session.get.await_count, MAX_RETRIES + 1)
+        self.assertEqual(self.sleep.await_count, MAX_RETRIES)
+        response.release.assert_not_called()
+
+    async def test_stops_retrying_on_success(self) -> None:
+        responses = [fake_response(429, {"Retry-After": "2"}), fake_response(200)]
+        self.client._session.get = mock.AsyncMock(side_effect=responses)
+
+        response = await self.client._get_with_retry("https://drive.example/uc")
+
+        self.assertIs(response, responses[1])
+        self.sleep.assert_awaited_once_with(2.0)
+
+
+class DownloadCacheTest(unittest.IsolatedAsyncioTestCase):
+    """ETag cache: fresh entries are used as-is, expired ones are revalidated."""
+
+    FILE_ID = "file-id"
+    BODY = b'{"mcpServers": {"s": {"url": "https://mcp.example"}}}'
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.client = DriveClient(cache_dir=tmp.name, cache_ttl=60.0)
+        self.client._write_cache(self.FILE_ID, self.BODY, '"etag-1"')
+        self.body_path, _ = self.client._cache_paths(self.FILE_ID)
+
+        self.response = mock.MagicMock(status=304, headers={})
+        self.response.__aenter__.return_value = self.response
+        patcher = mock.patch.object(
+            self.client, "_get_with_retry", mock.AsyncMock(return_value=self.response)
+        )
+        self.get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def expire_cache(self) -> None:
+        old = time.time() - 120.0
+        os.utime(self.body_path, (old, old))
+
+    async def test_fresh_entry_skips_the_request(self) -> None:
+        data = await self.client._download_json(self.FILE_ID)
+
+        self.assertIn("s", data["mcpServers"])
+        self.get.assert_not_awaited()
+
+    async def test_expired_entry_sends_if_none_match(self) -> None:
+        self.expire_cache()
+
+        await self.client._download_json(self.FILE_ID)
+
+        self.get.assert_awaited_once()
+        self.assertEqual(self.get.call_args.kwargs["headers"], {"If-None-Match": '"etag-1"'})
+
+    async def test_not_modified_reuses_cached_body(self) -> None:
+        self.expire_cache()
+
+        data = await self.client._download_json(self.FILE_ID)
+
+        self.assertEqual(data["mcpServers"]["s"]["url"], "https://mcp.example")
+        self.response.content.iter_chunked.assert_not_called()
+        # Revalidation restarts the TTL
+        self.assertLess(time.time() - self.body_path.stat().st_mtime, 60.0)
+
+    def test_cache_files_are_private(self) -> None:
+        for path in self.client._cache_paths(self.FILE_ID):
+            self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""Tests for the MCP client's retry and throttling logic."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from src.mcp_client import AdmissionController, CircuitBreaker, HostRateLimiter, MCPClient
+
+
+class ConnectTimeoutRetryTest(unittest.IsolatedAsyncioTestCase):
+    """A connect timeout is a transient failure, not an offline server."""
+
+    async def test_slow_connect_is_retried(self) -> None:
+        client = MCPClient(retries=2, backoff_base=0)
+        fetch = mock.AsyncMock(side_effect=[aiohttp.ServerTimeoutError("connect"), []])
+        with mock.patch.object(client, "_fetch_tools", fetch):
+            result = await client.fetch_tools_schema("slow", "http://slow.example/mcp")
+
+        self.assertEqual(result.status, "online")
+        self.assertEqual(fetch.await_count, 2)
+
+    async def test_connect_timeout_gives_up_after_retries(self) -> None:
+        client = MCPClient(retries=2, backoff_base=0)
+        fetch = mock.AsyncMock(side_effect=aiohttp.ServerTimeoutError("connect"))
+        with mock.patch.object(client, "_fetch_tools", fetch):
+            result = await client.fetch_tools_schema("dead", "http://dead.example/mcp")
+
+        self.assertEqual(result.status, "offline")
+        self.assertEqual(result.error_message, "Connection timeout (after 3 attempts)")
+        self.assertEqual(fetch.await_count, 3)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    """closed -> open -> half_open -> closed/open transitions."""
+
+    def setUp(self) -> None:
+        self.now = 1000.0
+        patcher = mock.patch("src.mcp_client.time", mock.Mock(monotonic=lambda: self.now))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(threshold=3, recovery_time=30.0)
+
+    def open_breaker(self) -> None:
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(False)
+
+    def test_opens_after_threshold_consecutive_failures(self) -> None:
+        for _ in range(2):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(False)
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(False)
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_failure_count(self) -> None:
+        for reachable in (False, False, True, False, False):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(reachable)
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_unknown_outcome_does_not_count(self) -> None:
+        for reachable in (False, False, None, None):
+            self.breaker.allow()
+            self.breaker.record(reachable)
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_half_open_admits_a_single_probe(self) -> None:
+        self.open_breaker()
+        self.now += 30.0
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+    def test_successful_probe_closes(self) -> None:
+        self.open_breaker()
+        self.now += 30.0
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(True)
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_reopens(self) -> None:
+        self.open_breaker()
+        self.now += 30.0
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(False)
+        self.assertEqual(self.breaker.state, "open")
+        self.now += 29.0
+        self.assertFalse(self.breaker.allow())
+
+
+class CircuitOpenSkipTest(unittest.IsolatedAsyncioTestCase):
+    """Servers behind an open breaker are skipped, not reported offline."""
+
+    async def test_open_circuit_skips_without_contacting_server(self) -> None:
+        client = MCPClient(retries=0, breaker_threshold=1)
+        fetch = mock.AsyncMock(side_effect=aiohttp.ClientConnectorError(mock.Mock(), OSError()))
+        with mock.patch.object(client, "_fetch_tools", fetch):
+            first = await client.fetch_tools_schema("a", "http://shared.example/a")
+            second = await client.fetch_tools_schema("b", "http://shared.example/b")
+
+        self.assertEqual(first.status, "error")
+        self.assertEqual(second.status, "skipped")
+        self.assertEqual(fetch.await_count, 1)
+
+
+class AdmissionControllerTest(unittest.IsolatedAsyncioTestCase):
+    """No more than `limit` tasks are admitted, and waiters wake on release."""
+
+    async def test_limit_is_never_exceeded(self) -> None:
+        admission = AdmissionController(3)
+        peak = 0
+
+        async def task() -> None:
+            nonlocal peak
+            async with admission:
+                peak = max(peak, admission.active)
+                await asyncio.sleep(0)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(task() for _ in range(20)))
+
+        self.assertEqual(peak, 3)
+        self.assertEqual(admission.active, 0)
+
+    async def test_waiter_wakes_on_release(self) -> None:
+        admission = AdmissionController(1)
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+
+        await admission.release()
+        await asyncio.wait_for(waiter, timeout=1)
+
+        self.assertEqual(admission.active, 1)
+
+    def test_rejects_non_positive_limit(self) -> None:
+        with self.assertRaises(ValueError):
+            AdmissionController(0)
+
+
+class HostRateLimiterTest(unittest.IsolatedAsyncioTestCase):
+    """GCRA spacing: `burst` calls pass at once, later ones wait 1/rate each."""
+
+    def setUp(self) -> None:
+        self.now = 100.0
+        self.sleeps: list[float] = []
+
+        async def fake_sleep(delay: float) -> None:
+            self.sleeps.append(delay)
+
+        for target, replacement in (
+            ("src.mcp_client.time", mock.Mock(monotonic=lambda: self.now)),
+            ("src.mcp_client.asyncio.sleep", fake_sleep),
+        ):
+            patcher = mock.patch(target, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_requests_to_one_host_are_spaced(self) -> None:
+        limiter = HostRateLimiter(rate=4, burst=1)
+        for _ in range(4):
+            await limiter.acquire("a")
+
+        self.assertEqual(self.sleeps, [0.25, 0.5, 0.75])
+
+    async def test_burst_passes_without_waiting(self) -> None:
+        limiter = HostRateLimiter(rate=4, burst=2)
+        for _ in range(3):
+            await limiter.acquire("a")
+
+        self.assertEqual(self.sleeps, [0.25])
+
+    async def test_hosts_are_independent(self) -> None:
+        limiter = HostRateLimiter(rate=1, burst=1)
+        await limiter.acquire("a")
+        await limiter.acquire("b")
+
+        self.assertEqual(self.sleeps, [])
+
+    async def test_idle_time_is_not_banked(self) -> None:
+        limiter = HostRateLimiter(rate=1, burst=1)
+        await limiter.acquire("a")
+        self.now += 10.0
+        await limiter.acquire("a")
+        await limiter.acquire("a")
+
+        self.assertEqual(self.sleeps, [1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Tests for the YAML catalog writer."""
+
+import unittest
+
+import yaml
+
+from src.mcp_client import ServerResult, ToolSchema
+from src.yaml_generator import YAMLGenerator, _SafeLoader
+
+
+class FastYAMLRoundTripTest(unittest.TestCase):
+    """--fast-yaml output must read back to the same catalog."""
+
+    # Characters YAML treats as line breaks (or a BOM) inside quoted scalars
+    BREAK_CHARACTERS = ("\x85", "\u2028", "\u2029", "\ufeff")
+
+    def assert_round_trip(self, catalog: dict) -> None:
+        text = YAMLGenerator(fast_yaml=True).to_yaml_string(catalog)
+        for loader in {yaml.SafeLoader, _SafeLoader}:
+            with self.subTest(loader=loader.__name__):
+                self.assertEqual(yaml.load(text, Loader=loader), catalog)
+
+    def test_line_break_characters_in_values(self) -> None:
+        for char in self.BREAK_CHARACTERS:
+            with self.subTest(char=repr(char)):
+                self.assert_round_trip({
+                    "servers": [{
+                        "id": "server",
+                        "tools": [
+                            {"name": "tool", "description": f"a{char}b"},
+                            {"name": "multi", "description": f"line 1\nline{char}2"},
+                            {"name": "edge", "description": f"{char}start and end{char}"},
+                        ],
+                    }],
+                })
+
+    def test_line_break_characters_in_keys(self) -> None:
+        for char in self.BREAK_CHARACTERS:
+            with self.subTest(char=repr(char)):
+                self.assert_round_trip({"schema": {f"key{char}name": {"type": "string"}}})
+
+    def test_matches_pyyaml_output_when_loaded(self) -> None:
+        catalog = {
+            "version": "1.0",
+            "servers": [{
+                "id": "s",
+                "status": "online",
+                "tools": [{
+                    "name": "t",
+                    "description": "日本語 ✅\nsecond line\n",
+                    "inputSchema": {"type": "object", "minimum": 5e-05, "flag": True},
+                }],
+            }],
+        }
+        fast = yaml.safe_load(YAMLGenerator(fast_yaml=True).to_yaml_string(catalog))
+        default = yaml.safe_load(YAMLGenerator().to_yaml_string(catalog))
+        self.assertEqual(fast, default)
+        self.assertEqual(fast, catalog)
+
+
+class SkippedServerTest(unittest.TestCase):
+    """Servers skipped by the circuit breaker never reach the catalog."""
+
+    NOW = "2026-10-15T00:00:00+00:00"
+
+    def result(self, server_id: str, status: str) -> ServerResult:
+        tools = [ToolSchema(name="t")] if status == "online" else []
+        return ServerResult(id=server_id, url="", status=status, last_checked=self.NOW, tools=tools)
+
+    def test_generate_leaves_out_skipped(self) -> None:
+        catalog = YAMLGenerator().generate_catalog(
+            [self.result("a", "online"), self.result("b", "skipped")]
+        )
+        self.assertEqual([s["id"] for s in catalog["servers"]], ["a"])
+        self.assertEqual(catalog["metadata"]["total_servers"], 1)
+
+    def test_merge_keeps_existing_entry_of_skipped(self) -> None:
+        existing_entry = {"id": "b", "status": "online", "last_checked": self.NOW, "tools": [{"name": "old"}]}
+        existing = {"metadata": {}, "servers": [dict(existing_entry)]}
+        merged = YAMLGenerator().merge_catalogs(
+            [self.result("a", "online"), self.result("b", "skipped"), self.result("c", "skipped")],
+            existing,
+        )
+        self.assertEqual([s["id"] for s in merged["servers"]], ["a", "b"])
+        self.assertEqual(merged["servers"][1], existing_entry)
+
+
+if __name__ == "__main__":
+    unittest.main()